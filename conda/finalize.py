@@ -1,19 +1,25 @@
 import os
+import re
 import sys
 
 def getBuildNumber(releaseVersion):
-    main, major, minor = releaseVersion.split(".")
-    buildNumber = 0x010000 * int(main) + 0x0100 * int(major) + 0x01 * int(minor)
+    matched = re.fullmatch(r"(\d+)\.(\d+)\.(\d+)", releaseVersion.strip())
+    if matched is None:
+        raise ValueError(f"Release version should be in format `main.major.minor`, got {releaseVersion}.")
+    main, major, minor = map(int, matched.groups())
+    buildNumber = 0x010000 * main + 0x0100 * major + 0x01 * minor
     return buildNumber
 
 def updateBuildNumber(fileName, releaseVersion):
-    with open(fileName) as fp:
+    # Raises on a bad tag before the file is truncated.
+    buildNumber = getBuildNumber(releaseVersion)
+    with open(fileName, "r+") as fp:
         lines = fp.readlines()
-
-    with open(fileName, "w") as fp:
+        fp.seek(0)
+        fp.truncate()
         for line in lines:
             if line.startswith("  number:"):
-                fp.write(f"  number: {getBuildNumber(releaseVersion)}{os.linesep}")
+                fp.write(f"  number: {buildNumber}{os.linesep}")
             else:
                 fp.write(line)
 
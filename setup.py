@@ -4,7 +4,7 @@ from distutils.util import strtobool
 
 
 INSTALL_REQUIRES = [
-    "torch>=1.9",
+    "torch>=2.0",
     "tqdm",
     "rich",
     "nvidia-ml-py3"
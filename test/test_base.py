@@ -3,7 +3,7 @@ import pytest
 from torch import nn
 import torch
 
-from vlutils.base import DataParallel, Module, Registrar, Restorable
+from vlutils.base import DataParallel, FrequecyHook, Module, Registry, Restorable
 from vlutils.metrics.helpers import recursiveCompare
 
 
@@ -14,7 +14,7 @@ def _initToOnes(m: nn.Module):
             nn.init.ones_(m.bias)
 
 
-class Factory(Registrar):
+class Factory(Registry):
     ...
 
 
@@ -48,6 +48,40 @@ class SimpleRestorable(Restorable):
         self._c = NestedRestorable()
 
 
+class _StateOnly:
+    def state_dict(self):
+        return {"s": 1}
+
+
+class LooseRestorable(Restorable):
+    def __init__(self):
+        super().__init__()
+        self._exported = _StateOnly()
+        self.__dict__["_unregistered"] = 0
+        self.plain = 1
+        self.valuesToSave.add("plain")
+
+
+class _PreInit:
+    def __init__(self):
+        self._pre = 1
+        self._flag = True
+        self._untouched = 2
+        super().__init__()
+
+
+class BatchRestorable(_PreInit, Restorable):
+    def __init__(self):
+        super().__init__()
+        with self._batchRegister():
+            self._pre = 5
+            # The same object as before, still an assignment.
+            self._flag = True
+            with self._batchRegister():
+                self._none = None
+            self._c = NestedRestorable()
+
+
 class TestBase:
     @pytest.fixture
     def getModule(self):
@@ -151,3 +185,40 @@ class TestBase:
                 "_t": torch.zeros([4])
             }
         })
+
+    def testFrequencyHook(self):
+        freqs = [1, 2, 3, 4, 6, 8]
+        hook = FrequecyHook(*((freq, lambda step, freq=freq: freq) for freq in freqs))
+        # Skipped, repeated and decreasing steps.
+        steps = [0, 1, 2, 5, 5, 6, 13, 16, 16, 3, 4, 7, 24, 100, 2, 48]
+        for step in steps:
+            expected = {freq: [freq] for freq in freqs if step % freq == 0}
+            assert hook(step) == expected
+        with pytest.raises(ValueError):
+            FrequecyHook((0, print))
+        with pytest.raises(ValueError):
+            hook.append(-2, print)
+        with pytest.raises(ValueError):
+            hook.extend((4, print), (0, print))
+
+    def testBatchRegister(self):
+        instance = BatchRestorable()
+        assert set(instance.state_dict()) == {"_pre", "_flag", "_none", "_c"}
+        # Attributes set before `Restorable.__init__` are registered only if reassigned in the block.
+        assert recursiveCompare(instance.state_dict(), {
+            "_pre": 5,
+            "_flag": True,
+            "_none": None,
+            "_c": {
+                "_t": torch.ones([3])
+            }
+        })
+
+    def testLoadUnregistered(self):
+        instance = LooseRestorable()
+        assert instance.state_dict() == {"_exported": {"s": 1}, "plain": 1}
+        # Values with only `state_dict` are replaced, unregistered attributes are loaded as well.
+        instance.load_state_dict({"_exported": 3, "_unregistered": 4})
+        assert instance._exported == 3 and instance._unregistered == 4
+        instance.valuesToSave.discard("plain")
+        assert instance.state_dict() == {"_exported": 3}
@@ -0,0 +1,35 @@
+from dataclasses import dataclass
+
+from vlutils.config import serialize
+
+
+class Inner:
+    def __init__(self):
+        self.name = "inner"
+        self.sizes = [1, 2, (3, 4)]
+        self.flag = True
+
+
+class Outer:
+    def __init__(self):
+        self.inner = Inner()
+        self.options = {"lr": 1e-3, "tags": {"a"}, "none": None}
+
+
+@dataclass
+class Simple:
+    x: int
+    y: str
+
+
+class TestConfig:
+    def testSerialize(self):
+        assert serialize(Outer()) == {
+            "inner": {
+                "name": "inner",
+                "sizes": [1, 2, (3, 4)],
+                "flag": True
+            },
+            "options": {"lr": 1e-3, "tags": {"a"}, "none": None}
+        }
+        assert serialize(Simple(3, "y")) == {"x": 3, "y": "y"}
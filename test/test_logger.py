@@ -0,0 +1,137 @@
+import os
+import sys
+import time
+import logging
+import threading
+import warnings
+
+import pytest
+
+from vlutils import logger as vlLogger
+from vlutils.logger import configLogging, KeywordRichHandler, BufferedFileHandler, LoggingDisabler
+
+
+@pytest.fixture
+def getLogger(tmp_path):
+    excepthook, showwarning = sys.excepthook, warnings.showwarning
+    rootName = "vlutils.test"
+    logger = configLogging(str(tmp_path), rootName, logName="test")
+    yield logger, tmp_path / "test.log"
+    if rootName in vlLogger._listeners:
+        vlLogger._listeners.pop(rootName).stop()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    sys.excepthook, warnings.showwarning = excepthook, showwarning
+
+
+def _drain(rootName: str):
+    # Stop the listener to handle all queued records, then write out buffered files.
+    listener = vlLogger._listeners.pop(rootName)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.flush()
+
+
+def _record(msg: str, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord("test", level, __file__, 0, msg, None, None)
+
+
+class TestLogger:
+    def testQueueListener(self, getLogger):
+        logger, logFile = getLogger
+        # The console is rendered synchronously, only files are written by the listener.
+        assert any(isinstance(handler, KeywordRichHandler) for handler in logger.handlers)
+        assert not any(isinstance(handler, logging.FileHandler) for handler in logger.handlers)
+        args = [1]
+        logger.info("queued %s", args)
+        # Records are formatted when enqueued, later mutation is not logged.
+        args.append(2)
+        logger.debug("dropped")
+        _drain(logger.name)
+        content = logFile.read_text()
+        assert "queued [1]" in content and "dropped" not in content
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="System does not support fork.")
+    def testFork(self, getLogger):
+        logger, logFile = getLogger
+        logger.info("parent before")
+        pid = os.fork()
+        if pid == 0:
+            try:
+                logger.info("child info")
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        logger.info("parent after")
+        _drain(logger.name)
+        content = logFile.read_text()
+        assert content.count("parent before") == 1
+        assert "child info" in content and "parent after" in content
+
+    def testBufferedFlushOnError(self, tmp_path):
+        logFile = tmp_path / "buffered.log"
+        handler = BufferedFileHandler(str(logFile), flushInterval=60.)
+        try:
+            handler.handle(_record("buffered info"))
+            assert logFile.read_text() == ""
+            handler.handle(_record("flushed error", logging.ERROR))
+            assert logFile.read_text() == "buffered info\nflushed error\n"
+        finally:
+            handler.close()
+        assert handler not in vlLogger._bufferedHandlers
+
+    def testBufferedFlusher(self, tmp_path):
+        handlers = [BufferedFileHandler(str(tmp_path / f"{i}.log"), flushInterval=.05) for i in range(3)]
+        try:
+            for i, handler in enumerate(handlers):
+                handler.handle(_record(f"periodic {i}"))
+            deadline = time.monotonic() + 5.
+            while time.monotonic() < deadline and not all((tmp_path / f"{i}.log").read_text() for i in range(3)):
+                time.sleep(.05)
+            assert all((tmp_path / f"{i}.log").read_text() == f"periodic {i}\n" for i in range(3))
+            # One flusher for all handlers.
+            assert sum(thread.name == "bufferedFileFlusher" for thread in threading.enumerate()) == 1
+        finally:
+            for handler in handlers:
+                handler.close()
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="System does not support fork.")
+    def testBufferedFork(self, tmp_path):
+        logFile = tmp_path / "fork.log"
+        handler = BufferedFileHandler(str(logFile), flushInterval=60.)
+        try:
+            handler.handle(_record("parent before"))
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    # Flushed on every record, since the child exits without flushing.
+                    handler.handle(_record("child info"))
+                finally:
+                    os._exit(0)
+            os.waitpid(pid, 0)
+            handler.handle(_record("parent after"))
+        finally:
+            handler.close()
+        # Buffered records before fork are written once, not again by the child.
+        assert logFile.read_text() == "parent before\nchild info\nparent after\n"
+
+    def testKeywordHighlight(self):
+        handler = KeywordRichHandler()
+        record = _record("Training finished with the best loss")
+        text = handler.render_message(record, record.getMessage())
+        # All keywords are matched by one combined pattern, each styled by its group.
+        assert [(text.plain[span.start:span.end], str(span.style)) for span in text.spans] == [("Training", "cyan"), ("finished", "red"), ("best", "green")]
+
+    def testLoggingDisabler(self):
+        logger = logging.getLogger("vlutils.test.disabler")
+        child = logging.getLogger("vlutils.test.disabler.child")
+        logger.setLevel(logging.DEBUG)
+        try:
+            with LoggingDisabler(logger, True):
+                assert logger.disabled and not child.isEnabledFor(logging.CRITICAL)
+            assert not logger.disabled and logger.level == logging.DEBUG and child.isEnabledFor(logging.DEBUG)
+            with LoggingDisabler(logger, False):
+                assert not logger.disabled and logger.level == logging.DEBUG
+        finally:
+            logger.setLevel(logging.NOTSET)
@@ -0,0 +1,60 @@
+import torch
+
+from vlutils.metrics.meter import Handler, Meters
+from vlutils.metrics.pairwise import l2Distance
+
+
+class _Identity(Handler):
+    def handle(self, results):
+        return results
+
+
+class _Doubled(Handler):
+    def handle(self, results):
+        return [2 * x for x in results]
+
+
+class _NoSuperInit(Handler):
+    def __init__(self):
+        pass
+
+    def handle(self, results):
+        return results
+
+
+class TestMeter:
+    def testAccumulatePrecision(self):
+        handler = _Identity()
+        step = torch.full((1000, ), 0.1)
+        for _ in range(2000):
+            handler(step)
+        # Exact sum of float32 0.1 in double, a float32 accumulator is off by about 1e-2.
+        expected = 2000 * 1000 * float(step[0])
+        assert handler.Length == 2000 * 1000
+        assert abs(handler.Accumulated - expected) < 1e-6
+        assert abs(handler.Result - float(step[0])) < 1e-12
+
+    def testSubclassWithoutSuperInit(self):
+        handler = _NoSuperInit()
+        handler([1., 2.])
+        assert handler.Length == 2 and handler.Result == 1.5
+
+    def testMetersSummary(self):
+        handlers = [_Identity(), _Doubled(r"%.1f")]
+        meters = Meters(handlers)
+        meters([1., 2.])
+        assert meters.summary() == ", ".join(repr(handler) for handler in handlers) == "_Identity: 1.50, _Doubled: 3.0"
+        assert meters.results(reset=True) == {"_Identity": 1.5, "_Doubled": 3.}
+        assert handlers[0].Length == 0
+
+
+class TestPairwise:
+    def testSelfDistance(self):
+        small = torch.randn(8, 16) * 100
+        assert torch.equal(l2Distance(small, small).diagonal(), torch.zeros(8))
+        large = torch.randn(512, 64) * 100
+        assert torch.equal(l2Distance(large, large, exact=True).diagonal(), torch.zeros(512))
+        # The GEMM form is close and never negative.
+        distance = l2Distance(large, large)
+        assert (distance >= 0).all()
+        assert torch.allclose(distance, l2Distance(large, large, exact=True), rtol=1e-4, atol=1.)
@@ -0,0 +1,151 @@
+import os
+
+import pytest
+
+from torch import nn
+import torch
+
+from vlutils.saver import Saver, loadCheckpoint
+from vlutils.metrics.helpers import recursiveCompare
+
+
+class TestSaver:
+    @pytest.fixture
+    def getSaver(self, tmp_path):
+        return Saver(str(tmp_path), loggingLevel="WARNING", activateTensorboard=False)
+
+    @pytest.fixture
+    def getModule(self):
+        return nn.Sequential(nn.Linear(3, 4), nn.BatchNorm1d(4))
+
+    def testSaveLoad(self, getSaver, getModule):
+        saver = getSaver
+        tensors = {
+            "sliced": torch.arange(10)[::2],
+            "bf16": torch.randn(3, dtype=torch.bfloat16),
+            "empty": torch.empty(0, 3),
+            "nested": [torch.ones(2), (torch.zeros(1), "str")]
+        }
+        saver.save(model=getModule, step=3, **tensors)
+
+        module = nn.Sequential(nn.Linear(3, 4), nn.BatchNorm1d(4))
+        loaded = Saver.load(saver.SavePath, model=module, step=None, **{k: None for k in tensors})
+        assert recursiveCompare(module.state_dict(), getModule.state_dict())
+        assert loaded["step"] == 3
+        for key, value in tensors.items():
+            assert recursiveCompare(loaded[key], value)
+
+    def testLoadTorchSaved(self, getSaver, getModule):
+        torch.save({"model": getModule.state_dict()}, getSaver.SavePath)
+        module = nn.Sequential(nn.Linear(3, 4), nn.BatchNorm1d(4))
+        Saver.load(getSaver.SavePath, model=module)
+        assert recursiveCompare(module.state_dict(), getModule.state_dict())
+        assert recursiveCompare(loadCheckpoint(getSaver.SavePath)["model"], getModule.state_dict())
+
+    def testSaveTorchFormat(self, getSaver, getModule):
+        saver = getSaver
+        saver.save(format="torch", model=getModule, step=3)
+        # Readable by `torch.load` as former versions.
+        loaded = torch.load(saver.SavePath)
+        assert recursiveCompare(loaded["model"], getModule.state_dict()) and loaded["step"] == 3
+        with pytest.raises(ValueError):
+            saver.save(format="torch", asynchronous=True, step=3)
+
+        saver.save(model=getModule, step=3)
+        loaded = loadCheckpoint(saver.SavePath)
+        assert recursiveCompare(loaded["model"], getModule.state_dict()) and loaded["step"] == 3
+
+    def testSaveParametersAndViews(self, getSaver):
+        saver = getSaver
+        weight = nn.Parameter(torch.randn(4, 3))
+        frozen = nn.Parameter(torch.randn(2), requires_grad=False)
+        base = torch.arange(12.)
+        saver.save(params=[weight, frozen], tied=[weight, weight], views=[base, base[2:8].view(2, 3), base[::3]])
+
+        loaded = Saver.load(saver.SavePath, params=None, tied=None, views=None)
+        params, tied, views = loaded["params"], loaded["tied"], loaded["views"]
+        assert isinstance(params[0], nn.Parameter) and params[0].requires_grad
+        assert isinstance(params[1], nn.Parameter) and not params[1].requires_grad
+        assert torch.equal(params[0], weight) and torch.equal(params[1], frozen)
+        # Aliases are written once and still share memory after loading.
+        assert tied[0].data_ptr() == tied[1].data_ptr() == params[0].data_ptr()
+        assert torch.equal(views[1], base[2:8].view(2, 3)) and torch.equal(views[2], base[::3])
+        views[0][2] = -1.
+        assert views[1][0, 0] == -1.
+
+    def testSaveShards(self, getSaver, getModule, monkeypatch):
+        # Shards are capped by the cpu count.
+        monkeypatch.setattr(os, "cpu_count", lambda: 2)
+        saver = getSaver
+        saver.save(numShards=2, model=getModule, big=torch.randn(1000), step=3)
+        firstParts = set(saver.SaveDir.glob(saver.SavePath.name + ".*.part*"))
+        assert len(firstParts) == 2
+        # A new save has its own parts, and former parts are removed.
+        saver.save(numShards=2, model=getModule, big=torch.randn(1000), step=3)
+        parts = set(saver.SaveDir.glob(saver.SavePath.name + ".*.part*"))
+        assert len(parts) == 2 and not parts & firstParts
+
+        module = nn.Sequential(nn.Linear(3, 4), nn.BatchNorm1d(4))
+        loaded = Saver.load(saver.SavePath, model=module, big=None, step=None)
+        assert recursiveCompare(module.state_dict(), getModule.state_dict())
+        assert loaded["big"].shape == (1000, ) and loaded["step"] == 3
+
+        saver.save(model=getModule)
+        assert not list(saver.SaveDir.glob(saver.SavePath.name + ".*.part*"))
+        Saver.load(saver.SavePath, model=module)
+
+    def testSaveAsync(self, getSaver, getModule):
+        saver = getSaver
+        big = torch.randn(1000)
+        expected = big.clone()
+        future = saver.save(asynchronous=True, model=getModule, big=big)
+        # Modifying after return does not affect the checkpoint.
+        big.zero_()
+        future.result()
+
+        module = nn.Sequential(nn.Linear(3, 4), nn.BatchNorm1d(4))
+        loaded = Saver.load(saver.SavePath, model=module, big=None)
+        assert recursiveCompare(module.state_dict(), getModule.state_dict())
+        assert recursiveCompare(loaded["big"], expected)
+
+    def testSaveDtype(self, getSaver, getModule):
+        saver = getSaver
+        optimizer = torch.optim.Adam(getModule.parameters())
+        with torch.enable_grad():
+            for _ in range(3):
+                getModule(torch.randn(5, 3)).sum().backward()
+                optimizer.step()
+        # Not representable in bfloat16.
+        for state in optimizer.state.values():
+            state["step"].fill_(1001)
+        saver.save(dtype=torch.bfloat16, model=getModule, opt=optimizer)
+
+        module = nn.Sequential(nn.Linear(3, 4), nn.BatchNorm1d(4))
+        restored = torch.optim.Adam(module.parameters())
+        Saver.load(saver.SavePath, model=module, opt=restored)
+        # Modules and 0-dim counters are exact, other optimizer states are lossy.
+        assert recursiveCompare(module.state_dict(), getModule.state_dict())
+        state, restoredState = optimizer.state_dict()["state"][0], restored.state_dict()["state"][0]
+        assert restoredState["step"] == state["step"] == 1001
+        assert torch.allclose(restoredState["exp_avg"], state["exp_avg"], rtol=1e-2)
+
+        with pytest.raises(TypeError):
+            saver.save(dtype=3, model=getModule)
+
+    def testDumpFile(self, tmp_path):
+        source = tmp_path / "source"
+        (source / "pkg").mkdir(parents=True)
+        (source / "pkg" / "a.py").write_text("x = 1\n")
+
+        def getSaver():
+            return Saver(str(tmp_path / "saved"), loggingLevel="WARNING", reserve=True, dumpFile=str(source), activateTensorboard=False)
+
+        dumped = getSaver().SaveDir / "dump" / "pkg" / "a.py"
+        assert dumped.read_text() == "x = 1\n"
+        # An edit keeping size and mtime is dumped again.
+        stat = (source / "pkg" / "a.py").stat()
+        (source / "pkg" / "a.py").write_text("x = 2\n")
+        os.utime(source / "pkg" / "a.py", ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        saver = getSaver()
+        assert dumped.read_text() == "x = 2\n"
+        assert not (saver.SaveDir / "dump.hash").exists()
@@ -3,6 +3,7 @@ from itertools import chain
 from typing import Callable, Optional, Union, List
 import functools
 import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import torch
 from torch import nn
@@ -17,21 +18,20 @@ __all__ = [
 
 
 def _get_a_var(obj):
-    if isinstance(obj, torch.Tensor):
-        return obj
-
-    if isinstance(obj, list) or isinstance(obj, tuple):
-        for result in map(_get_a_var, obj):
-            if isinstance(result, torch.Tensor):
-                return result
-    if isinstance(obj, dict):
-        for result in map(_get_a_var, obj.items()):
-            if isinstance(result, torch.Tensor):
-                return result
+    # Depth-first walk with an explicit stack, children are pushed reversed to find the same first tensor as recursion does.
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, torch.Tensor):
+            return obj
+        if isinstance(obj, (list, tuple)):
+            stack.extend(reversed(obj))
+        elif isinstance(obj, dict):
+            stack.extend(reversed(obj.items()))
     return None
 
 
-def _parallel_apply(modules, funcName: str, inputs, kwargs_tup=None, devices=None):
+def _parallel_apply(modules, funcName: str, inputs, kwargs_tup=None, devices=None, executor: Optional[ThreadPoolExecutor] = None):
     """Applies each `module` in :attr:`modules` in parallel on arguments
     contained in :attr:`inputs` (positional) and :attr:`kwargs_tup` (keyword)
     on each of :attr:`devices`.
@@ -40,6 +40,8 @@ def _parallel_apply(modules, funcName: str, inputs, kwargs_tup=None, devices=Non
         modules (Module): modules to be parallelized
         inputs (tensor): inputs to the modules
         devices (list of int or torch.device): CUDA devices
+        executor (ThreadPoolExecutor, optional): Persistent workers to run
+            replicas on, otherwise a thread is started for each replica
 
     :attr:`modules`, :attr:`inputs`, :attr:`kwargs_tup` (if given), and
     :attr:`devices` (if given) should all have same length. Moreover, each
@@ -77,7 +79,12 @@ def _parallel_apply(modules, funcName: str, inputs, kwargs_tup=None, devices=Non
                 results[i] = ExceptionWrapper(
                     where="in replica {} on device {}".format(i, device))
 
-    if len(modules) > 1:
+    if len(modules) > 1 and executor is not None:
+        for future in [executor.submit(_worker, i, module, input, kwargs, device)
+                       for i, (module, input, kwargs, device) in
+                       enumerate(zip(modules, inputs, kwargs_tup, devices))]:
+            future.result()
+    elif len(modules) > 1:
         threads = [threading.Thread(target=_worker,
                                     args=(i, module, input, kwargs, device))
                    for i, (module, input, kwargs, device) in
@@ -126,6 +133,28 @@ def parallelFunction(function: Callable):
     return wrappedFn
 
 
+def _wrappedFunctions(module: nn.Module) -> List[Callable]:
+    """Bound functions of module decorated by `parallelFunction` (or any wrapper with `__wrapped__`).
+
+    Walks the instance and class dicts directly, other than `dir()` plus `getattr()` which goes through `nn.Module.__getattr__` for every name.
+    """
+    seen = set()
+    result = list()
+    namespaces = chain([(vars(module), False)], ((vars(klass), True) for klass in type(module).__mro__))
+    for namespace, needBind in namespaces:
+        for name, attr in namespace.items():
+            if name in seen:
+                continue
+            seen.add(name)
+            if not (callable(attr) or isinstance(attr, (staticmethod, classmethod))):
+                continue
+            # Bind first, a staticmethod itself has `__wrapped__` while the function it holds does not.
+            fn = attr.__get__(module, type(module)) if needBind and hasattr(attr, "__get__") else attr
+            if getattr(fn, "__wrapped__", None) is not None:
+                result.append(fn)
+    return result
+
+
 class DataParallel(nn.DataParallel):
     """Customized `nn.DataParallel`.
 
@@ -150,13 +179,24 @@ class DataParallel(nn.DataParallel):
         device_ids (Optional[List[Union[int, torch.device]]], optional): Devices to be placed on. Defaults to None.
         output_device (Union[int, torch.device], optional): Devices where results placed. Defaults to None.
         dim (int, optional): Which dimension of input to be splitted for parallel. Defaults to 0.
+        cacheReplicas (bool, optional): Reuse replicas made under `torch.no_grad()` until parameters, buffers or modes change. In-place updates are tracked, but writes through `.data` (e.g. EMA updates by `p.data.mul_()`) are not and leave stale replicas, so only enable it if the module is never updated that way. Defaults to False.
     """
-    def __init__(self, module: nn.Module, device_ids: Optional[List[Union[int, torch.device]]] = None, output_device: Union[int, torch.device] = None, dim: int = 0):
+    def __init__(self, module: nn.Module, device_ids: Optional[List[Union[int, torch.device]]] = None, output_device: Union[int, torch.device] = None, dim: int = 0, cacheReplicas: bool = False):
         super().__init__(module, device_ids, output_device, dim)
-        fns = [getattr(module, fn) for fn in dir(module) if callable(getattr(module, fn))]
-        for fn in fns:
-            if getattr(fn, "__wrapped__", None) is not None:
-                setattr(self, fn.__name__, self._parallelFnWrapper(fn))
+        self._cacheReplicas = cacheReplicas
+        # Replicas made under `torch.no_grad()`, reused until parameters or buffers change.
+        self._replicaCache: Optional[List[nn.Module]] = None
+        self._replicaVersion: Optional[tuple] = None
+        # Workers of `_parallel_apply`, created on first use.
+        self._executor: Optional[ThreadPoolExecutor] = None
+        for fn in _wrappedFunctions(module):
+            setattr(self, fn.__name__, self._parallelFnWrapper(fn))
+
+    def __getstate__(self):
+        # Thread pool and cached replicas are not copyable.
+        state = super().__getstate__()
+        state.update(_replicaCache=None, _replicaVersion=None, _executor=None)
+        return state
 
     def _parallelFnWrapper(self, func):
         @functools.wraps(func)
@@ -164,16 +204,34 @@ class DataParallel(nn.DataParallel):
             if not self.device_ids:
                 return func(*inputs, **kwargs)
 
+            # Modes of all submodules, e.g. a frozen BatchNorm set to eval inside a training model.
+            version = [tuple(m.training for m in self.module.modules())] if self._cacheReplicas else None
             for t in chain(self.module.parameters(), self.module.buffers()):
                 if t.device != self.src_device_obj:
                     raise RuntimeError("module must have its parameters and buffers "
                                        "on device {} (device_ids[0]) but found one of "
                                        "them on device: {}".format(self.src_device_obj, t.device))
+                if version is not None:
+                    version.append((t.data_ptr(), t._version))
+            version = None if version is None else tuple(version)
 
             inputs, kwargs = self.scatter(inputs, kwargs, self.device_ids)
             if len(self.device_ids) == 1:
                 return func(*inputs[0], **kwargs[0])
-            replicas = self.replicate(self.module, self.device_ids[:len(inputs)])
-            outputs = _parallel_apply(replicas, func.__name__, inputs, kwargs, self.device_ids[:len(replicas)])
+            replicas = self._replicas(len(inputs), version)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=len(self.device_ids), thread_name_prefix="DataParallel")
+            outputs = _parallel_apply(replicas, func.__name__, inputs, kwargs, self.device_ids[:len(replicas)], self._executor)
             return self.gather(outputs, self.output_device)
         return parallelApply
+
+    def _replicas(self, count: int, version: Optional[tuple]) -> List[nn.Module]:
+        # Replicas with autograd history can not be reused, the broadcast graph is consumed by backward.
+        if version is None or torch.is_grad_enabled():
+            self._replicaCache = self._replicaVersion = None
+            return self.replicate(self.module, self.device_ids[:count])
+        if self._replicaCache is None or version != self._replicaVersion or len(self._replicaCache) < count:
+            # `version` tracks in-place updates (optimizer steps, `load_state_dict`) and swapped tensors, but not writes through `.data`.
+            self._replicaCache = self.replicate(self.module, self.device_ids[:count])
+            self._replicaVersion = version
+        return self._replicaCache[:count]
@@ -2,6 +2,7 @@
 
 Originally from https://github.com/pytorch/pytorch/blob/671ee71ad4b6f507218d1cad278a8e743780b716/torch/autograd/grad_mode.py#L16
 """
+from typing import Optional
 import inspect
 import functools
 import abc
@@ -38,11 +39,19 @@ class DecoratorContextManager(abc.ABC):
         # Equivalent
         addD(3, 4)
     ```
+
+    By default a decorated generator enters and exits the context around every `next()`, which keeps
+    torch's grad-mode semantics. Set `_batch_generator = True` on a subclass to enter the context once
+    for the whole run (or once per `_generator_batch_size` yields) instead.
     """
+    _batch_generator: bool = False
+    _generator_batch_size: Optional[int] = None
 
     def __call__(self, func):
         if inspect.isgeneratorfunction(func):
-            return self._wrap_generator(func)
+            if self._batch_generator:
+                return self._wrap_generator_batched(func, self._generator_batch_size)
+            return self._wrap_generator_strict(func)
 
         @functools.wraps(func)
         def decorate_context(*args, **kwargs):
@@ -50,7 +59,7 @@ class DecoratorContextManager(abc.ABC):
                 return func(*args, **kwargs)
         return decorate_context
 
-    def _wrap_generator(self, func):
+    def _wrap_generator_strict(self, func):
         """Wrap each generator invocation with the context manager"""
         @functools.wraps(func)
         def generator_context(*args, **kwargs):
@@ -64,6 +73,29 @@ class DecoratorContextManager(abc.ABC):
                     break
         return generator_context
 
+    _wrap_generator = _wrap_generator_strict
+
+    def _wrap_generator_batched(self, func, batch: Optional[int] = None):
+        """Wrap runs of `batch` generator invocations (all of them if None) with a single context"""
+        @functools.wraps(func)
+        def generator_context(*args, **kwargs):
+            gen = func(*args, **kwargs)
+            if batch is None:
+                with self:
+                    yield from gen
+                return
+            exhausted = False
+            while not exhausted:
+                with self:
+                    for _ in range(batch):
+                        try:
+                            x = next(gen)
+                        except StopIteration:
+                            exhausted = True
+                            break
+                        yield x
+        return generator_context
+
     @abc.abstractmethod
     def __enter__(self):
         raise NotImplementedError
@@ -1,5 +1,6 @@
+import heapq
 import logging
-from typing import Dict, Callable, Any, List, Tuple, Union
+from typing import Dict, Callable, Any, List, Tuple, Union, Optional
 
 from vlutils.runtime import functionFullName
 
@@ -37,27 +38,53 @@ class FrequecyHook:
     Args:
         freqAndHooks (Dict[int, Callable]): The function (`value`) to call every `key` steps.
     """
+    __slots__ = ("_hooks", "_logger", "_schedule", "_lastStep", "_compiled", "__weakref__")
+
     def __init__(self, *freqAndHooks: Tuple[int, Callable], logger: Union[logging.Logger, "vlutils.logger.LoggerBase"]=logging):
         self._hooks: Dict[int, List[Callable]] = dict()
         self._logger = logger
+        # A min-heap of (next step to fire, insertion order, freq, -freq if freq is a power of two else 0), built lazily on the first call.
+        self._schedule: Optional[List[Tuple[int, int, int, int]]] = None
+        self._lastStep: Optional[int] = None
+        # Hooks and their full names of each freq, built lazily with the schedule.
+        self._compiled: Optional[Dict[int, Tuple[Tuple[Callable, ...], Tuple[str, ...]]]] = None
         for key, value in freqAndHooks:
-            if key not in self._hooks:
-                self._hooks[key] = list()
-            self._hooks[key].append(value)
+            self._add(key, value)
+
+    def _add(self, freq: int, hook: Callable):
+        # The schedule advances by freq, which never reaches the current step if freq <= 0.
+        if freq <= 0:
+            raise ValueError(f"Frequency must be positive, got {freq}.")
+        if freq not in self._hooks:
+            self._hooks[freq] = list()
+        self._hooks[freq].append(hook)
+        self._schedule = self._compiled = None
 
     def extend(self, *freqAndHooks: Tuple[int, Callable]):
         for key, value in freqAndHooks:
-            if key not in self._hooks:
-                self._hooks[key] = list()
-            self._hooks[key].append(value)
+            self._add(key, value)
 
     def append(self, freq: int, hook: Callable):
-        if freq not in self._hooks:
-            self._hooks[freq] = list()
-        self._hooks[freq].append(hook)
+        self._add(freq, hook)
 
     def remove(self, freq: int):
         self._hooks.pop(freq)
+        self._schedule = self._compiled = None
+
+    def _compile(self):
+        self._compiled = {key: (tuple(value), tuple(functionFullName(fn) for fn in value)) for key, value in self._hooks.items()}
+
+    @staticmethod
+    def _ceil(step: int, key: int, mask: int) -> int:
+        # The first multiple of key not less than step, a bitwise and for powers of two.
+        if mask:
+            return (step + key - 1) & mask
+        return -(-step // key) * key
+
+    def _reschedule(self, step: int):
+        masks = ((key, -key if key & (key - 1) == 0 else 0) for key in self._hooks)
+        self._schedule = [(self._ceil(step, key, mask), i, key, mask) for i, (key, mask) in enumerate(masks)]
+        heapq.heapify(self._schedule)
 
     def __call__(self, step: int, *args: Any, **kwArgs: Any) -> Dict[int, Any]:
         """Check whether the step % key == 0, if True, call value by args and kwArgs.
@@ -68,18 +95,44 @@ class FrequecyHook:
         Returns:
             Dict[int, Any]: if the function is called, add its key and return value into this dict.
         """
+        if self._schedule is None or step <= self._lastStep:
+            self._reschedule(step)
+        if self._compiled is None:
+            self._compile()
+        self._lastStep = step
+        schedule = self._schedule
         results = dict()
-        for key, value in self._hooks.items():
-            if step % key == 0:
-                results[key] = list()
-                for fn in value:
-                    fullName = functionFullName(fn)
-                    self._logger.debug("Call %s(...) by FrequecyHook@%d", fullName, key)
-                    results[key].append(fn(step, *args, **kwArgs))
+        if not schedule or schedule[0][0] > step:
+            return results
+        fired = list()
+        while schedule[0][0] <= step:
+            nextStep, order, key, mask = schedule[0]
+            if nextStep < step:
+                # Some steps are skipped, catch up to the next multiple.
+                nextStep = self._ceil(step, key, mask)
+            if nextStep == step:
+                fired.append((order, key))
+                nextStep += key
+            heapq.heapreplace(schedule, (nextStep, order, key, mask))
+        # Keep the calling order same as the registering order.
+        fired.sort()
+        isEnabledFor = getattr(self._logger, "isEnabledFor", None)
+        debug = self._logger.debug if isEnabledFor is None or isEnabledFor(logging.DEBUG) else None
+        for _, key in fired:
+            fns, fullNames = self._compiled[key]
+            if debug is None:
+                results[key] = [fn(step, *args, **kwArgs) for fn in fns]
+                continue
+            results[key] = result = list()
+            for fn, fullName in zip(fns, fullNames):
+                debug("Call %s(...) by FrequecyHook@%d", fullName, key)
+                result.append(fn(step, *args, **kwArgs))
         return results
 
     def __str__(self) -> str:
-        pretty = { f"{key}": [f"<{fullName}>" for fullName in (functionFullName(func) for func in value)] for key, value in self._hooks.items() }
+        if self._compiled is None:
+            self._compile()
+        pretty = { f"{key}": [f"<{fullName}>" for fullName in fullNames] for key, (_, fullNames) in self._compiled.items() }
         result = ""
         for key, value in pretty.items():
             value = ", ".join(value)
@@ -88,6 +141,8 @@ class FrequecyHook:
 
 
 class ChainHook:
+    __slots__ = ("_hooks", "_hookNames", "__weakref__")
+
     def __init__(self, *hooks: Union["ChainHook", Callable[..., Dict[str, Any]]]) -> None:
         allHooks = list()
         for h in hooks:
@@ -95,17 +150,22 @@ class ChainHook:
                 allHooks.extend(h._hooks)
             else:
                 allHooks.append(h)
-        self._hooks: List[Callable[..., Dict[str, Any]]] = [h for h in allHooks if h is not None]
+        # Fixed after construction, a tuple iterates a bit faster.
+        self._hooks: Tuple[Callable[..., Dict[str, Any]], ...] = tuple(h for h in allHooks if h is not None)
+        # Joined full names of hooks, formatted on the first `__str__`.
+        self._hookNames: Optional[str] = None
 
     def __call__(self, *args: Any, **kwds: Any) -> Dict[str, Any]:
         results: Dict[str, Any] = dict()
+        update = results.update
         for hook in self._hooks:
             result = hook(*args, **kwds)
             if result is not None:
-                results.update(result)
+                update(result)
         return results
 
     def __str__(self) -> str:
-        hookNames = [functionFullName(h) for h in self._hooks]
-        hookNames = ",\r\n    ".join(hookNames)
+        if self._hookNames is None:
+            self._hookNames = ",\r\n    ".join(functionFullName(h) for h in self._hooks)
+        hookNames = self._hookNames
         return f"ChainHook(\r\n    {hookNames})"
@@ -1,5 +1,5 @@
 """Module for custom nn.Module"""
-from typing import Any, Union
+from typing import Any, Dict, Union
 from abc import abstractmethod
 import types
 
@@ -12,6 +12,13 @@ __all__ = [
 ]
 
 
+def _directCall(key: str):
+    def call(self, *args: Any, **kwargs: Any) -> Any:
+        return self._functions[key](*args, **kwargs)
+    call.__name__ = f"call_{key}"
+    return call
+
+
 class Module(nn.Module):
     """Custom nn.Module
 
@@ -34,8 +41,34 @@ class Module(nn.Module):
         y = net("forward", x)
         # Call net._loss
         loss = net("loss", y, label)
+        # Or directly, without dispatching and hooks
+        loss = net.call_loss(y, label)
     ```
     """
+    # Mapping from registered keys to attribute names, collected once per class.
+    _vlutilsFunctionMap: Dict[str, str] = dict()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        attributes = dict()
+        # Resolve names the same way as `getattr`, derived classes override bases.
+        for klass in reversed(cls.__mro__):
+            attributes.update(vars(klass))
+        functionMap = dict()
+        for name, value in attributes.items():
+            if isinstance(value, property):
+                value = value.fget
+            elif isinstance(value, (staticmethod, classmethod)):
+                value = value.__func__
+            key = getattr(value, "_vlutilsModuleMappedFunction", None)
+            if key is not None:
+                functionMap[key] = name
+        cls._vlutilsFunctionMap = functionMap
+        for key in functionMap:
+            # Direct entry `net.call_{key}(...)`, skips `forward` dispatching (and hooks of `nn.Module.__call__`).
+            if not hasattr(cls, f"call_{key}"):
+                setattr(cls, f"call_{key}", _directCall(key))
+
     @staticmethod
     def register(key):
         """Decorator for register forward function into module.
@@ -54,12 +87,12 @@ class Module(nn.Module):
     def __init__(self):
         super().__init__()
         self._functions = dict()
-        for methodname in dir(self):
-            method = getattr(self, methodname)
-            if isinstance(method, property):
-                method = method.fget
-            if hasattr(method, "_vlutilsModuleMappedFunction"):
-                self._functions[method._vlutilsModuleMappedFunction] = method
+        for key, name in self._vlutilsFunctionMap.items():
+            attribute = getattr(type(self), name)
+            if isinstance(attribute, property):
+                self._functions[key] = types.MethodType(attribute.fget, self)
+            else:
+                self._functions[key] = getattr(self, name)
 
     def _replicate_for_data_parallel(self):
         replica = super()._replicate_for_data_parallel()
@@ -2,7 +2,8 @@
 import functools
 import os
 import logging
-from typing import Dict, Union, Generic, TypeVar
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Union, Generic, TypeVar
 
 from vlutils.utils import pPrint
 
@@ -13,6 +14,33 @@ __all__ = [
 ]
 
 
+def _qualname(value) -> str:
+    if isinstance(value, functools.partial):
+        value = value.func
+    # Instances (without `__qualname__`) are named by their types.
+    named = value if hasattr(value, "__qualname__") else type(value)
+    return f"{named.__module__}.{named.__qualname__}"
+
+
+def _specializeGet(cls: type) -> Callable[..., Any]:
+    """Same as `Registry.get`, with the class dicts bound in advance, saves the classmethod binding and attribute lookups per call."""
+    mapGet = cls._map.get
+    qualnames = cls._qualnames
+    name = cls.__name__
+
+    def get(key: str, logger: Union[logging.Logger, "vlutils.logger.LoggerBase"] = logging.root):
+        result = mapGet(key)
+        if result is None:
+            raise KeyError(f"No entry for {name}. Avaliable entries are: {os.linesep + cls.summary()}.")
+        isEnabledFor = getattr(logger, "isEnabledFor", None)
+        if isEnabledFor is None or isEnabledFor(logging.DEBUG):
+            logger.debug("Get <%s> from \"%s\".", qualnames.get(key) or _qualname(result), name)
+        return result
+    functools.update_wrapper(get, Registry.get.__func__)
+    get._vlutilsRegistryGet = True
+    return get
+
+
 class Registry(Generic[T]):
     """A registry. Inherit from it to create a lots of factories.
 
@@ -40,9 +68,24 @@ class Registry(Generic[T]):
     ```
     """
     _map: Dict[str, T]
+    mapView: Mapping[str, T]
+    # Full names of registered objects for logging, formatted once at registration.
+    _qualnames: Dict[str, str]
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
         cls._map: Dict[str, T] = dict()
+        cls._qualnames: Dict[str, str] = dict()
+        # Read-only live view of the registry, `Geometry.mapView["Bar"]` is a plain mapping lookup.
+        cls.mapView: Mapping[str, T] = MappingProxyType(cls._map)
+        # Specialize `get` unless it is customized.
+        if "get" not in vars(cls) and getattr(cls.get, "_vlutilsRegistryGet", False):
+            cls.get = staticmethod(_specializeGet(cls))
+
+    def __class_getitem__(cls, key):
+        # `Registry[T]` parameterizes the generic, `Geometry["Bar"]` looks up a concrete registry.
+        if isinstance(key, str) and "_map" in cls.__dict__:
+            return cls._map[key]
+        return super().__class_getitem__(key)
 
     @classmethod
     def register(cls, key):
@@ -54,10 +97,12 @@ class Registry(Generic[T]):
         if isinstance(key, str):
             def insert(value):
                 cls._map[key] = value
+                cls._qualnames[key] = _qualname(value)
                 return value
             return insert
         else:
             cls._map[key.__name__] = key
+            cls._qualnames[key.__name__] = _qualname(key)
             return key
 
     @classmethod
@@ -70,11 +115,28 @@ class Registry(Generic[T]):
         result = cls._map.get(key)
         if result is None:
             raise KeyError(f"No entry for {cls.__name__}. Avaliable entries are: {os.linesep + cls.summary()}.")
-        elif isinstance(result, functools.partial):
-            logger.debug("Get <%s.%s> from \"%s\".", result.func.__module__, result.func.__qualname__, cls.__name__)
-        else:
-            logger.debug("Get <%s.%s> from \"%s\".", result.__module__, result.__qualname__, cls.__name__)
+        isEnabledFor = getattr(logger, "isEnabledFor", None)
+        if isEnabledFor is None or isEnabledFor(logging.DEBUG):
+            qualname = cls._qualnames.get(key)
+            logger.debug("Get <%s> from \"%s\".", qualname or _qualname(result), cls.__name__)
         return result
+    # Subclasses replace it by `_specializeGet`.
+    get.__func__._vlutilsRegistryGet = True
+
+    @classmethod
+    def getFast(cls) -> Callable[[str], T]:
+        """Get the raw lookup function of registry, for hot paths that call it frequently.
+
+        Example:
+        ```python
+            get = Geometry.getFast()
+            instance = get("Bar")()
+        ```
+
+        Returns:
+            Callable[[str], T]: A function maps key to the registered object, raise `KeyError` if key not found.
+        """
+        return cls._map.__getitem__
 
     @classmethod
     def values(cls):
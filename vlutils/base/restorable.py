@@ -1,6 +1,7 @@
 """Module of Restorable class"""
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 import abc
+import contextlib
 
 
 __all__ = [
@@ -9,6 +10,21 @@ __all__ = [
 ]
 
 
+class _SavedNames(dict):
+    """Names of attributes to be saved, mapped to whether the attribute has its own state-dict, None if not checked yet.
+
+    `valuesToSave` used to be a set, its `add`, `discard` and `remove` are kept.
+    """
+    def add(self, name: str):
+        self.setdefault(name, None)
+
+    def discard(self, name: str):
+        self.pop(name, None)
+
+    def remove(self, name: str):
+        del self[name]
+
+
 class Dictable(abc.ABC):
     """An abstract class implements PyTorch-like state-dict."""
 
@@ -45,33 +61,76 @@ class Restorable(Dictable):
         # { "_x": 3 }
         foo.state_dict()
         foo.load_state_dict({ "_x": 1 })
+
+        class Bar(Restorable):
+            def __init__(self):
+                super().__init__()
+                # Register all fields at once when the block exits.
+                with self._batchRegister():
+                    self._x = 3
+                    self._y = 4
     ```
 
     Attributes:
-        valuesToSave (set): names of all attributes to be saved.
+        valuesToSave (Dict[str, Optional[bool]]): names of all attributes to be saved, mapped to whether the attribute has its own state-dict. Also supports `add`, `discard` and `remove` of a set.
     """
     def __init__(self):
-        self.valuesToSave = set()
+        self.valuesToSave: Dict[str, Optional[bool]] = _SavedNames()
+
+    @staticmethod
+    def _isDictable(value: Any) -> bool:
+        return callable(getattr(value, "state_dict", None))
+
+    @contextlib.contextmanager
+    def _batchRegister(self):
+        """Defer registering attributes set in this block until it exits."""
+        values = self.__dict__
+        if "batchAssigned" in values:
+            # Nested in another block, which registers everything when it exits.
+            yield
+            return
+        # `__setattr__` only records names here.
+        assigned = values["batchAssigned"] = set()
+        try:
+            yield
+        finally:
+            del values["batchAssigned"]
+            valuesToSave = values.get("valuesToSave")
+            if valuesToSave is not None:
+                valuesToSave.update((name, self._isDictable(values[name])) for name in assigned if name in values)
 
     def state_dict(self):
-        return {key: self.__dict__[key].state_dict() if callable(getattr(self.__dict__[key], "state_dict", None)) else self.__dict__[key] for key in self.valuesToSave}
+        values = self.__dict__
+        return {key: values[key].state_dict() if nested or (nested is None and self._isDictable(values[key])) else values[key] for key, nested in self.valuesToSave.items()}
 
     def load_state_dict(self, stateDict: Dict[str, Any], strict: bool = True):
-        for key, value in self.__dict__.items():
+        values = self.__dict__
+        valuesToSave = self.valuesToSave
+        # All attributes start with '_' are loaded, including those not registered.
+        for key, value in list(values.items()):
             if not key.startswith("_"):
                 continue
             if callable(getattr(value, "load_state_dict", None)):
-                value.load_state_dict(stateDict[key])  # pylint: disable = no-member
+                value.load_state_dict(stateDict[key])
             elif key not in stateDict:
                 if strict:
                     raise RuntimeError(f"{key} not in stateDict.")
                 else:
                     continue
             else:
-                self.__dict__[key] = stateDict[key]
+                values[key] = stateDict[key]
+                if key in valuesToSave:
+                    valuesToSave[key] = self._isDictable(stateDict[key])
 
     def __setattr__(self, name: str, value: Any):
-        self.__dict__[name] = value
-        if hasattr(self, "valuesToSave"):
-            if name.startswith("_"):
-                self.valuesToSave.add(name)
+        values = self.__dict__
+        values[name] = value
+        if not name.startswith("_"):
+            return
+        assigned = values.get("batchAssigned")
+        if assigned is not None:
+            assigned.add(name)
+            return
+        valuesToSave = values.get("valuesToSave")
+        if valuesToSave is not None:
+            valuesToSave[name] = self._isDictable(value)
@@ -1,10 +1,13 @@
 """Module of serialization/deserialization."""
+import functools
+import itertools
 import logging
 from logging import Logger
 from pathlib import Path
-from typing import Any, Dict, Type, TypeVar, get_origin, get_args, _SpecialForm, Union, _GenericAlias
+from typing import Any, Callable, Dict, FrozenSet, List, Tuple, Type, TypeVar, get_origin, get_args, _SpecialForm, Union, _GenericAlias
 from dataclasses import Field, is_dataclass, asdict
 import keyword
+import re
 from io import StringIO
 
 import yaml
@@ -18,21 +21,31 @@ __all__ = [
 ]
 
 
+@functools.lru_cache(maxsize=None)
+def _placeholderPattern(keys: FrozenSet[str]) -> "re.Pattern":
+    return re.compile("|".join(re.escape("{{{0}}}".format(key)) for key in keys))
+
+
 def _preprocess(plainStr: str, **varsToReplace):
-    for key, value in varsToReplace.items():
-        plainStr = plainStr.replace("{{{0}}}".format(key), str(value))
-    return plainStr
+    if not varsToReplace:
+        return plainStr
+    # Substitute all placeholders in one scan, "{key}" -> str(value).
+    return _placeholderPattern(frozenset(varsToReplace)).sub(lambda match: str(varsToReplace[match.group(0)[1:-1]]), plainStr)
 
 
 def _replaceKeyword(parsedYaml: dict) -> dict:
     if not isinstance(parsedYaml, dict):
         return parsedYaml
-    newDict = dict()
-    for key, value in parsedYaml.items():
-        if keyword.iskeyword(key):
-            key += "_"
-        newDict[key] = _replaceKeyword(value)
-    return newDict
+    newDict = None
+    for i, (key, value) in enumerate(parsedYaml.items()):
+        newKey = key + "_" if keyword.iskeyword(key) else key
+        newValue = _replaceKeyword(value)
+        # Subtrees without keywords are returned as is, a new dict is built only from the first change.
+        if newDict is None and (newKey is not key or newValue is not value):
+            newDict = dict(itertools.islice(parsedYaml.items(), i))
+        if newDict is not None:
+            newDict[newKey] = newValue
+    return parsedYaml if newDict is None else newDict
 
 
 def _assert(name, instance, types):
@@ -40,14 +53,97 @@ def _assert(name, instance, types):
         raise TypeError(f"{name} in yaml not match the type definition in {name} ({types}), got {type(instance)}.")
 
 
+# Dispatched by type, one cached lookup per node instead of a chain of `isinstance`.
+@functools.singledispatch
 def _serialize(instance: Any) -> dict:
-    if isinstance(instance, (str, int, bool, float)):
-        return instance
-    if isinstance(instance, list, set, tuple):
-        return instance.__class__(_serialize(x) for x in instance)
-    if isinstance(instance, dict):
-        return {k: _serialize(v) for k, v in instance.items()}
-    return {k: _serialize(v) for k, v in instance.__dict__}
+    return {k: _serialize(v) for k, v in vars(instance).items()}
+
+
+@_serialize.register(str)
+@_serialize.register(int)
+@_serialize.register(float)
+@_serialize.register(type(None))
+def _serializeScalar(instance: Any) -> Any:
+    return instance
+
+
+@_serialize.register(list)
+@_serialize.register(set)
+@_serialize.register(tuple)
+def _serializeContainer(instance: Any) -> Any:
+    return instance.__class__(_serialize(x) for x in instance)
+
+
+@_serialize.register(dict)
+def _serializeDict(instance: dict) -> dict:
+    return {k: _serialize(v) for k, v in instance.items()}
+
+
+def _deserializeScalar(attr: str, value: Any, classDef: type, logger: Logger):
+    _assert(attr, value, classDef)
+    return value
+
+
+def _deserializeContainer(attr: str, value: Any, classDef: type, logger: Logger):
+    _assert(attr, value, (list, set, tuple))
+    return classDef(_deserialize(x, type(x), logger) for x in value)
+
+
+def _deserializeDict(attr: str, value: Any, _: None, logger: Logger):
+    _assert(attr, value, dict)
+    return {k: _deserialize(x, type(x), logger) for k, x in value.items()}
+
+
+def _deserializeGenericContainer(attr: str, value: Any, originAndArg: Tuple[type, type], logger: Logger):
+    origin, arg = originAndArg
+    _assert(attr, value, (list, set, tuple))
+    return origin(_deserialize(x, arg, logger) for x in value)
+
+
+def _deserializeGenericDict(attr: str, value: Any, arg: type, logger: Logger):
+    return {k: _deserialize(x, arg, logger) for k, x in value.items()}
+
+
+def _deserializeDataclass(attr: str, value: Any, classDef: type, logger: Logger):
+    return _deserialize(value, classDef, logger)
+
+
+@functools.lru_cache(maxsize=None)
+def _buildPlan(classDef: type) -> List[Tuple[str, bool, Callable[[str, Any, Any, Logger], Any], Any]]:
+    """Classify all fields of a dataclass once.
+
+    Returns:
+        List[Tuple[str, bool, Callable, Any]]: Each item is (field name, whether the field defaults to None, handler, extra argument of handler).
+    """
+    annotations: Dict[str, Field] = classDef.__dataclass_fields__
+    plan = list()
+    for attr, fieldDef in annotations.items():
+        if fieldDef.type in (str, int, bool, float):
+            handler, extra = _deserializeScalar, fieldDef.type
+        elif fieldDef.type in (list, set, tuple):
+            handler, extra = _deserializeContainer, fieldDef.type
+        elif fieldDef.type is dict:
+            handler, extra = _deserializeDict, None
+        elif isinstance(fieldDef.type, _GenericAlias):
+            origin = get_origin(fieldDef.type)
+            if origin not in (list, set, tuple, dict):
+                raise TypeError(f"{attr} in {classDef} is not any of (str, int, bool, float, list, set, tuple, dict), or generic list/dict/tuple, got {fieldDef.type}.")
+            args = get_args(fieldDef.type)
+            for arg in args:
+                if issubclass(arg, _SpecialForm):
+                    raise NotImplementedError(f"Not support for {attr} which is annotated as a special form {arg}.")
+            if origin in (list, set, tuple):
+                handler, extra = _deserializeGenericContainer, (origin, args[0])
+            else:
+                if args[0] is not str:
+                    raise TypeError(f"Dict must have str as key, {attr} in {classDef} has {args[0]} as key.")
+                handler, extra = _deserializeGenericDict, args[1]
+        elif is_dataclass(fieldDef.type):
+            handler, extra = _deserializeDataclass, fieldDef.type
+        else:
+            raise TypeError(f"Unrecognized type {fieldDef.type} of {attr} in {fieldDef}.")
+        plan.append((attr, fieldDef.default is None, handler, extra))
+    return plan
 
 
 def _deserialize(parsedYaml: Union[dict, str, int, bool, float, list, set, tuple], classDef: Type[T], logger: Logger) -> T:
@@ -57,40 +153,11 @@ def _deserialize(parsedYaml: Union[dict, str, int, bool, float, list, set, tuple
         return classDef(x for x in parsedYaml)
     if classDef is dict:
         return classDef((k, v) for k, v in parsedYaml.items())
-    annotations: Dict[str, Field] = classDef.__dataclass_fields__
     updateDict = dict()
-    for attr, fieldDef in annotations.items():
-        if attr not in parsedYaml and (fieldDef.default is None):
+    for attr, defaultsToNone, handler, extra in _buildPlan(classDef):
+        if defaultsToNone and attr not in parsedYaml:
             raise AttributeError(f"{attr} not found in yaml and no init method provide.")
-        if fieldDef.type in (str, int, bool, float):
-            _assert(attr, parsedYaml[attr], fieldDef.type)
-            updateDict[attr] = parsedYaml[attr]
-        elif fieldDef.type in (list, set, tuple):
-            _assert(attr, parsedYaml[attr], (list, set, tuple))
-            updateDict[attr] = fieldDef.type(_deserialize(x, type(x), logger) for x in parsedYaml[attr])
-        elif fieldDef.type is dict:
-            _assert(attr, parsedYaml[attr], dict)
-            updateDict[attr] = {k: _deserialize(x, type(x), logger) for k, x in parsedYaml[attr].items()}
-        else:
-            if isinstance(fieldDef.type, _GenericAlias):
-                origin = get_origin(fieldDef.type)
-                if origin not in (list, set, tuple, dict):
-                    raise TypeError(f"{attr} in {classDef} is not any of (str, int, bool, float, list, set, tuple, dict), or generic list/dict/tuple, got {fieldDef.type}.")
-                args = get_args(fieldDef.type)
-                for arg in args:
-                    if issubclass(arg, _SpecialForm):
-                        raise NotImplementedError(f"Not support for {attr} which is annotated as a special form {arg}.")
-                if origin in (list, set, tuple):
-                    _assert(attr, parsedYaml[attr], (list, set, tuple))
-                    updateDict[attr] = origin(_deserialize(x, args[0], logger) for x in parsedYaml[attr])
-                elif origin is dict:
-                    if args[0] is not str:
-                        raise TypeError(f"Dict must have str as key, {attr} in {classDef} has {args[0]} as key.")
-                    updateDict[attr] = {k: _deserialize(x, args[1], logger) for k, x in parsedYaml[attr].items()}
-            elif is_dataclass(fieldDef.type):
-                updateDict[attr] = _deserialize(parsedYaml[attr], fieldDef.type, logger)
-            else:
-                raise TypeError(f"Unrecognized type {fieldDef.type} of {attr} in {fieldDef}.")
+        updateDict[attr] = handler(attr, parsedYaml[attr], extra, logger)
     return classDef(**updateDict)
 
 
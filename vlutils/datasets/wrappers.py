@@ -22,7 +22,8 @@ class Zip(Dataset):
         return len(self._data[0])
 
     def __getitem__(self, idx):
-        return tuple(d[idx] for d in self._data)
+        # A list comprehension is cheaper than feeding `tuple()` a generator.
+        return tuple([d[idx] for d in self._data])
 
 
 class Enumerate(Dataset):
@@ -37,27 +38,19 @@ class Enumerate(Dataset):
     def __init__(self, data: Dataset, mode: str = "asis"):
         super().__init__()
         self._data = data
-        if mode not in ["asis", "absolute"]:
-            raise ValueError(f"Given mode not in ['asis', 'absolute'], got {mode}.")
-        self._map = {
-            "asis": self._asIs,
-            "absolute": self._absolute
-        }
-        self._idxMapping = self._map[mode]
+        self.mode(mode)
 
     def mode(self, mode: str = "asis"):
         if mode not in ["asis", "absolute"]:
             raise ValueError(f"Given mode not in ['asis', 'absolute'], got {mode}.")
-        self._idxMapping = self._map[mode]
-
-    def _asIs(self, idx):
-        return idx
-
-    def _absolute(self, idx):
-        return (idx + len(self)) % len(self)
+        # A flag checked inline, instead of an index mapping method called per sample.
+        self._absolute = mode == "absolute"
 
     def __len__(self):
         return len(self._data)
 
     def __getitem__(self, idx):
-        return self._idxMapping(idx), self._data[idx]
+        # Only negative indices need mapping, valid ones are in [-len, len).
+        if self._absolute and idx < 0:
+            return idx + len(self._data), self._data[idx]
+        return idx, self._data[idx]
@@ -39,11 +39,11 @@ def deleteDir(path):
 
 
 def deleteFilesOlderThan(folder: str, seconds: int):
-    now = time.time()
-    for f in os.listdir(folder):
-        if os.path.isfile(os.path.join(folder, f)):
-            if os.stat(os.path.join(folder, f)).st_mtime < now - seconds:
-                os.remove(os.path.join(folder, f))
+    deadline = time.time() - seconds
+    with os.scandir(folder) as it:
+        for entry in it:
+            if entry.is_file() and entry.stat().st_mtime < deadline:
+                os.remove(entry.path)
 
 
 def rotateItems(folder: str, count: int):
@@ -53,15 +53,14 @@ def rotateItems(folder: str, count: int):
         folder (str): Directory to rotate.
         count (int): How many newer items want to preserve.
     """
-    file_list = []
-    for f in os.listdir(folder):
-        file_list.append(f)
-    file_list = sorted(file_list, key=lambda f: os.stat(os.path.join(folder, f)).st_mtime)
-    if len(file_list) <= count:
+    # DirEntry caches its stat result, so each item is stat-ed only once.
+    with os.scandir(folder) as it:
+        entries = list(it)
+    if len(entries) <= count:
         return
-    for f in file_list[:-count]:
-        f = os.path.join(folder, f)
-        if os.path.isfile(f):
-            os.remove(f)
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in entries[:-count]:
+        if entry.is_file():
+            os.remove(entry.path)
         else:
-            shutil.rmtree(f)
+            shutil.rmtree(entry.path)
@@ -1,16 +1,22 @@
 """Module of logging"""
-from typing import ClassVar, List, Optional, TypeVar, Union
+from typing import ClassVar, Dict, List, Optional, Pattern, Tuple, TypeVar, Union
 import abc
 import functools
 import os
+import re
 import sys
 import warnings
 import logging
 import logging.config
+import logging.handlers
 from logging import LogRecord
+import atexit
+import queue
 import datetime
-import multiprocessing
+import itertools
+import threading
 import time
+import weakref
 import rich.logging
 from rich.console import ConsoleRenderable
 from rich.text import Text
@@ -76,17 +82,36 @@ def trackingFunctionCalls(function: T, logger: Union[logging.Logger, LoggerBase]
     else:
         funcArgs = ()
         funcKwArgs = dict()
+    isEnabledFor = getattr(logger, "isEnabledFor", None)
     def wrapper(*args, **kwArgs):
-        allArgs = ", ".join(str(arg) for arg in (args + funcArgs))
-        allkwArgs = ", ".join(f"{key}={value}" for key, value in {**kwArgs, **funcKwArgs}.items())
-        if len(allArgs) > 0:
-            logger.debug("Call %s(%s, %s)", fullName, allArgs, allkwArgs)
-        else:
-            logger.debug("Call %s(%s)", fullName, allkwArgs)
+        # Formatting all arguments is expensive, skip when debug records would be dropped anyway.
+        if isEnabledFor is not None and not isEnabledFor(logging.DEBUG):
+            return function(*args, **kwArgs)
+        logger.debug("Call %s(%s)", fullName, _CallArguments(args + funcArgs, {**kwArgs, **funcKwArgs}))
         return function(*args, **kwArgs)
     return wrapper
 
 
+class _CallArguments:
+    """Format call arguments only when a record is actually rendered."""
+    __slots__ = ("_args", "_kwArgs")
+
+    def __init__(self, args: tuple, kwArgs: dict):
+        self._args = args
+        self._kwArgs = kwArgs
+
+    def __str__(self) -> str:
+        allArgs = ", ".join(str(arg) for arg in self._args)
+        allkwArgs = ", ".join(f"{key}={value}" for key, value in self._kwArgs.items())
+        if len(allArgs) > 0:
+            return f"{allArgs}, {allkwArgs}"
+        return allkwArgs
+
+
+_BINARY_UNITS = ("B", "kiB", "MiB", "GiB", "TiB", "PiB")
+_DECIMAL_UNITS = ("B", "kB", "MB", "GB", "TB", "PB")
+
+
 def readableSize(byteSize: int, floating: int = 2, binary: bool = True) -> str:
     """Convert bytes to human-readable string (like `-h` option in POSIX).
 
@@ -98,19 +123,13 @@ def readableSize(byteSize: int, floating: int = 2, binary: bool = True) -> str:
     Returns:
         str: Human-readable string of size.
     """
-    size = float(byteSize)
-    unit = "B"
+    # Pick the unit from the integral magnitude directly, thresholds are integers so flooring does not change it.
+    magnitude = int(byteSize) if byteSize > 0 else 0
     if binary:
-        for unit in ["B", "kiB", "MiB", "GiB", "TiB", "PiB"]:
-            if size < 1024.0 or unit == "PiB":
-                break
-            size /= 1024.0
-        return f"{size:.{floating}f}{unit}"
-    for unit in ["B", "kB", "MB", "GB", "TB", "PB"]:
-        if size < 1000.0 or unit == "PB":
-            break
-        size /= 1000.0
-    return f"{size:.{floating}f}{unit}"
+        exponent = min(5, max(0, magnitude.bit_length() - 1) // 10)
+        return f"{byteSize / (1 << (10 * exponent)):.{floating}f}{_BINARY_UNITS[exponent]}"
+    exponent = min(5, (len(str(magnitude)) - 1) // 3)
+    return f"{byteSize / 1000 ** exponent:.{floating}f}{_DECIMAL_UNITS[exponent]}"
 
 
 class WaitingBar(DecoratorContextManager):
@@ -137,32 +156,29 @@ class WaitingBar(DecoratorContextManager):
             raise ValueError("ncols must greater than 8, got %d", ncols)
         self._msg = msg
         self._ticker = None
-        self._stillRunning = None
+        self._stop = None
         self._ncols = ncols
-        self.animation = list()
         # "       =       "
         template = (" " * (ncols + 1) + "=" * (ncols - 8) + " " * (ncols + 1))
-        for i in range(2 * (ncols - 2)):
-            start = 2 * (ncols - 2) - i
-            end = 3 * (ncols - 2) - i
-            self.animation.append("[" + template[start:end] + "]" + r" %s")
+        # All frames are fully formatted with msg here, the ticker only prints them.
+        self.animation = tuple("[" + template[start:start + ncols - 2] + "] " + msg for start in range(2 * (ncols - 2), 0, -1))
 
     def __enter__(self):
-        self._stillRunning = multiprocessing.Value("b", True)
-        self._ticker = multiprocessing.Process(name="waitingBarTicker", target=self._print, args=[self._stillRunning])
+        self._stop = threading.Event()
+        self._ticker = threading.Thread(name="waitingBarTicker", target=self._print, args=(self._stop,), daemon=True)
         self._ticker.start()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self._stillRunning.value = False
+        self._stop.set()
         self._ticker.join()
         print(" " * (len(self._msg) + self._ncols + 1), end="\r", file=sys.stderr)
 
-    def _print(self, stillRunning: multiprocessing.Value):
-        i = 0
-        while bool(stillRunning.value):
-            print(self.animation[i % len(self.animation)] % self._msg, end='\r', file=sys.stderr)
-            time.sleep(.06)
-            i += 1
+    def _print(self, stop: threading.Event):
+        for frame in itertools.cycle(self.animation):
+            if stop.is_set():
+                break
+            print(frame, end='\r', file=sys.stderr)
+            stop.wait(.06)
 
 
 class LoggingDisabler:
@@ -184,14 +200,19 @@ class LoggingDisabler:
         self._logger = logger
         self._disable = disable
         self._previous_status = False
+        self._previous_level = logging.NOTSET
 
     def __enter__(self):
         if self._disable:
             self._previous_status = self._logger.disabled
+            self._previous_level = self._logger.level
             self._logger.disabled = True
+            # Children inheriting the level then drop records in `isEnabledFor`, before any `LogRecord` is built.
+            self._logger.setLevel(logging.CRITICAL + 1)
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self._disable:
+            self._logger.setLevel(self._previous_level)
             self._logger.disabled = self._previous_status
 
 
@@ -202,6 +223,12 @@ class _DeprecationFilter:
         return 1
 
 
+@functools.lru_cache(maxsize=None)
+def _keywordPattern(keywords: Tuple[str, ...]) -> Pattern[str]:
+    # All keywords in one alternation, the message is scanned once. Each keyword names its style by a unique group.
+    return re.compile("|".join(f"(?:{keyword})" for keyword in keywords))
+
+
 class KeywordRichHandler(rich.logging.RichHandler):
     KEYWORDS: ClassVar[Optional[List[str]]] = [
         r"(?P<green>\b([gG]ood|[bB]etter|[bB]est|[sS]uccess(|ful|fully))\b)",
@@ -219,9 +246,7 @@ class KeywordRichHandler(rich.logging.RichHandler):
         highlighter = getattr(record, "highlighter", self.highlighter)
 
         if self.KEYWORDS:
-            for keyword in self.KEYWORDS:
-                message_text.highlight_regex(keyword)
-                # message_text.highlight_words(value, key, case_sensitive=False)
+            message_text.highlight_regex(_keywordPattern(tuple(self.KEYWORDS)))
 
         if highlighter:
             message_text = highlighter(message_text)
@@ -229,6 +254,170 @@ class KeywordRichHandler(rich.logging.RichHandler):
         return message_text
 
 
+class BufferedFileHandler(logging.FileHandler):
+    """A `FileHandler` writes through a buffer, which is flushed periodically and on ERROR or above, other than on every record.
+
+    Records in the buffer are lost if the process is killed (e.g. by SIGKILL or the OOM killer), at most those of the last `flushInterval`.
+        All handlers are flushed by one shared background thread. In a forked child every record is flushed.
+
+    Args:
+        flushInterval (float, optional): Seconds between background flushes. Defaults to 1.
+    """
+    def __init__(self, filename: str, mode: str = "a", encoding: Optional[str] = None, delay: bool = False, flushInterval: float = 1., **kwargs):
+        self._isClosed = False
+        self._flushEachRecord = False
+        self._flushInterval = flushInterval
+        self._nextFlush = time.monotonic() + flushInterval
+        super().__init__(filename, mode, encoding, delay, **kwargs)
+        _registerBuffered(self)
+
+    def _open(self):
+        # `errors` is only known by `FileHandler` since python 3.9.
+        return open(self.baseFilename, self.mode, buffering=_FILE_BUFFER_BYTES, encoding=self.encoding, errors=getattr(self, "errors", None))
+
+    def emit(self, record: LogRecord):
+        # Same as `FileHandler.emit` except flushing.
+        if self.stream is None:
+            if self.mode != "w" or not self._isClosed:
+                self.stream = self._open()
+        if not self.stream:
+            return
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            if self._flushEachRecord or record.levelno >= logging.ERROR:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        # The flusher flushes under the handler lock, so `super().close()` waits for a flush in flight, and no flush follows once unregistered.
+        _unregisterBuffered(self)
+        super().close()
+        self._isClosed = True
+
+
+_FILE_BUFFER_BYTES = 1 << 16
+# Buffered handlers to be flushed by `_flusher`. `_flusherLock` guards them, it is never held while acquiring handler locks.
+_bufferedHandlers: "weakref.WeakSet[BufferedFileHandler]" = weakref.WeakSet()
+_flusherLock = threading.Lock()
+_flusher: Optional[threading.Thread] = None
+
+
+def _registerBuffered(handler: BufferedFileHandler):
+    global _flusher
+    with _flusherLock:
+        _bufferedHandlers.add(handler)
+        if _flusher is None:
+            _flusher = threading.Thread(name="bufferedFileFlusher", target=_flushPeriodically, daemon=True)
+            _flusher.start()
+
+
+def _unregisterBuffered(handler: BufferedFileHandler):
+    with _flusherLock:
+        _bufferedHandlers.discard(handler)
+
+
+def _flushPeriodically():
+    global _flusher
+    while True:
+        with _flusherLock:
+            if not _bufferedHandlers:
+                # Restarted by the next handler.
+                _flusher = None
+                return
+            handlers = list(_bufferedHandlers)
+        now = time.monotonic()
+        for handler in handlers:
+            if now < handler._nextFlush:
+                continue
+            handler._nextFlush = now + handler._flushInterval
+            try:
+                # A closed handler has no stream, flushing it does nothing.
+                handler.flush()
+            except Exception:
+                # Reported by the next `emit` which fails the same way.
+                pass
+        wait = min(handler._nextFlush for handler in handlers) - now
+        # Not to keep handlers alive while sleeping.
+        del handlers, handler
+        time.sleep(max(wait, 0.01))
+
+
+_heldAcrossFork: List[BufferedFileHandler] = list()
+
+
+def _flushBeforeFork():
+    # Buffers are copied by `fork`, write them out first so the child does not write them again. Locks are held until forked.
+    with _flusherLock:
+        _heldAcrossFork[:] = _bufferedHandlers
+    for handler in _heldAcrossFork:
+        handler.acquire()
+        handler.flush()
+    _flusherLock.acquire()
+
+
+def _releaseAfterFork():
+    _flusherLock.release()
+    for handler in _heldAcrossFork:
+        handler.release()
+    _heldAcrossFork.clear()
+
+
+def _unbufferInChild():
+    global _flusherLock, _flusher
+    # Handler locks are already recreated by `logging` in the child. The flusher thread does not exist there.
+    for handler in _heldAcrossFork:
+        handler._flushEachRecord = True
+    _heldAcrossFork.clear()
+    _bufferedHandlers.clear()
+    _flusherLock = threading.Lock()
+    _flusher = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_flushBeforeFork, after_in_parent=_releaseAfterFork, after_in_child=_unbufferInChild)
+
+
+class _LocalQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records for a `QueueListener` in the same process.
+
+    Only merges args into msg, so records are not affected by later mutation of args, while `exc_info` is kept for rich tracebacks.
+    """
+    def prepare(self, record: LogRecord) -> LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# Background listeners that run the file handlers, by root name of `configLogging`.
+_listeners: Dict[str, logging.handlers.QueueListener] = dict()
+
+
+@atexit.register
+def _stopListeners():
+    # Flush pending records on shutdown.
+    while _listeners:
+        _listeners.popitem()[1].stop()
+
+
+def _restoreHandlersInChild():
+    # Listener threads are not copied by `fork`, so the child would only enqueue records that nobody handles. Log directly there.
+    while _listeners:
+        rootName, listener = _listeners.popitem()
+        rootLogger = logging.getLogger(rootName)
+        for handler in list(rootLogger.handlers):
+            if isinstance(handler, _LocalQueueHandler):
+                rootLogger.removeHandler(handler)
+        for handler in listener.handlers:
+            rootLogger.addHandler(handler)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restoreHandlersInChild)
+
+
 def configLogging(logDir: Optional[str] = None, rootName: str = "", level: Union[str, int] = logging.INFO, logName: Optional[str] = None, rotateLogs: int = 10, ignoreWarnings: Optional[list] = None) -> logging.Logger:
     """Logger configuration.
 
@@ -282,7 +471,7 @@ def configLogging(logDir: Optional[str] = None, rootName: str = "", level: Union
                 "enable_link_path": False
             },
             "info_file": {
-                "class": "logging.FileHandler",
+                "class": "vlutils.logger.BufferedFileHandler",
                 "level": level,
                 "formatter": "full",
                 "filename": logFile,
@@ -300,7 +489,20 @@ def configLogging(logDir: Optional[str] = None, rootName: str = "", level: Union
             }
         }
     }
+    # Handlers of a former configuration are closed by `dictConfig`, drain them first.
+    if rootName in _listeners:
+        _listeners.pop(rootName).stop()
     logging.config.dictConfig(logging_config)
+    # File writing runs in a background thread, logging calls only enqueue records for it.
+    # The console is still rendered by the calling thread, to keep order with `print` and progress bars.
+    rootLogger = logging.getLogger(rootName)
+    handlers = [handler for handler in rootLogger.handlers if isinstance(handler, logging.FileHandler)]
+    records = queue.SimpleQueue()
+    for handler in handlers:
+        rootLogger.removeHandler(handler)
+    rootLogger.addHandler(_LocalQueueHandler(records))
+    _listeners[rootName] = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listeners[rootName].start()
 
     def handleException(exc_type, exc_value, exc_traceback):
         if issubclass(exc_type, KeyboardInterrupt):
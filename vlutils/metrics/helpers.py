@@ -10,22 +10,32 @@ __all__ = [
 
 
 def recursiveCompare(a: Any, b: Any) -> bool:
-    if isinstance(a, (list, set, tuple)):
-        return isinstance(b, (list, set, tuple)) and all(recursiveCompare(x, y) for x, y in zip(a, b))
-    elif isinstance(a, dict):
-        if not isinstance(b, dict):
-            return False
-        for key, value in a.items():
-            if key not in b:
+    # Walk with an explicit stack instead of recursion, pairs are compared depth-first in the same order.
+    stack = [(a, b)]
+    while stack:
+        a, b = stack.pop()
+        if isinstance(a, (list, set, tuple)):
+            if not isinstance(b, (list, set, tuple)):
                 return False
-            if not recursiveCompare(value, b[key]):
+            stack.extend(reversed(list(zip(a, b))))
+        elif isinstance(a, dict):
+            if not isinstance(b, dict):
                 return False
-        return True
-    else:
-        if type(a) != type(b):
-            return False
-        if isinstance(a, torch.Tensor):
-            return torch.equal(a, b)
-        if isinstance(a, np.ndarray):
-            return np.array_equal(a, b)
-        return a == b
+            pairs = list()
+            for key, value in a.items():
+                if key not in b:
+                    return False
+                pairs.append((value, b[key]))
+            stack.extend(reversed(pairs))
+        else:
+            if type(a) != type(b):
+                return False
+            if isinstance(a, torch.Tensor):
+                if not torch.equal(a, b):
+                    return False
+            elif isinstance(a, np.ndarray):
+                if not np.array_equal(a, b):
+                    return False
+            elif not a == b:
+                return False
+    return True
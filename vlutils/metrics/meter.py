@@ -1,9 +1,12 @@
-from typing import Any, Iterable, List
+from typing import Any, Iterable, List, Union
 import abc
 
+import torch
+
 
 class Handler(abc.ABC):
-    accumulated: float = 0.0
+    # A 0-dim tensor on the device of results if `handle` returns tensors, only synchronized when read.
+    accumulated: Union[float, torch.Tensor] = 0.0
     length: int = 0
 
     def __init__(self, format: str = r"%.2f"):
@@ -25,19 +28,24 @@ class Handler(abc.ABC):
 
     @property
     def Accumulated(self) -> float:
-        return self.accumulated
+        return float(self.accumulated)
 
     @property
     def Result(self) -> float:
-        return self.accumulated / self.length
+        return float(self.accumulated) / self.length
 
     def __call__(self, *args: Any, **kwds: Any):
         results = self.handle(*args, **kwds)
-        self.length += len(results)
-        self.accumulated += sum(results)
+        if isinstance(results, torch.Tensor):
+            self.length += results.numel()
+            # Summed in float64 as the python float accumulator, float32 sums drift over long epochs.
+            self.accumulated += results.detach().sum(dtype=torch.float64)
+        else:
+            self.length += len(results)
+            self.accumulated += sum(results)
 
     def __str__(self) -> str:
-        return self._format % (self.accumulated / self.length)
+        return self._format % self.Result
 
     def __repr__(self) -> str:
         return self.__class__.__name__ + ": " + str(self)
@@ -47,12 +55,18 @@ class Handler(abc.ABC):
         self.length = 0
 
     @abc.abstractmethod
-    def handle(self, *args: Any, **kwds: Any) -> List[float]:
+    def handle(self, *args: Any, **kwds: Any) -> Union[List[float], torch.Tensor]:
+        """Compute per-sample results of a step.
+
+        Returns:
+            Union[List[float], torch.Tensor]: Results to accumulate, a tensor is reduced on its device without synchronization.
+        """
         raise NotImplementedError
 
 class Meters:
     def __init__(self, handlers: Iterable[Handler]):
         self._handlers = list(h for h in handlers)
+        self._named = [(h.__class__.__name__, h) for h in self._handlers]
 
     def __call__(self, *args, **kwds):
         for handler in self._handlers:
@@ -63,17 +77,14 @@ class Meters:
             handler.reset()
 
     def summary(self, reset: bool = False):
-        result = ", ".join(repr(handler) for handler in self._handlers if handler.ShowInSummary)
+        # Same as `repr(handler)` with the precomputed name.
+        result = ", ".join(f"{name}: {handler}" for name, handler in self._named if handler.ShowInSummary)
         if reset:
             self.reset()
         return result
 
     def results(self, reset: bool = False):
-        result = {
-            handler.__class__.__name__: handler.Result
-                for handler
-                    in self._handlers
-        }
+        result = {name: handler.Result for name, handler in self._named}
         if reset:
             self.reset()
         return result
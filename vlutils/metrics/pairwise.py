@@ -1,3 +1,5 @@
+from typing import Optional
+
 import torch
 
 
@@ -7,12 +9,38 @@ __all__ = [
 ]
 
 
-def l2DistanceWithNorm(A: torch.Tensor, B: torch.Tensor):
-    diff = ((A.unsqueeze(1) - B) ** 2).sum(2)
+# Inputs with N * M * D no more than it are computed by the exact form, its [N, M, D] intermediate is small.
+_EXACT_ELEMENTS = 1 << 20
+
+
+def l2DistanceWithNorm(A: torch.Tensor, B: torch.Tensor, dtype: Optional[torch.dtype] = None, exact: bool = False):
+    diff = l2Distance(A, B, dtype, exact)
     maxi, _ = diff.max(1, keepdim=True)
     norm = diff / maxi
     return norm
 
 
-def l2Distance(A: torch.Tensor, B: torch.Tensor):
-    return ((A.unsqueeze(1) - B) ** 2).sum(2)
+def l2Distance(A: torch.Tensor, B: torch.Tensor, dtype: Optional[torch.dtype] = None, exact: bool = False):
+    """Pairwise squared L2 distances between rows of A [N, D] and B [M, D].
+
+    Large inputs are computed by ‖a‖² + ‖b‖² - 2ab with a GEMM, which may give small positive distances between identical rows.
+        Small inputs, or all inputs if `exact`, are computed from differences, where identical rows are exactly 0 apart.
+
+    Args:
+        A (torch.Tensor): [N, D] tensor.
+        B (torch.Tensor): [M, D] tensor.
+        dtype (torch.dtype, optional): If given, the [N, M] cross term of the GEMM form is computed in this dtype, e.g. `torch.bfloat16` to use tensor cores. Squared norms and the result keep the input dtype. Defaults to None.
+        exact (bool, optional): Always compute from differences, with an [N, M, D] intermediate. Defaults to False.
+
+    Returns:
+        torch.Tensor: [N, M] distances.
+    """
+    if exact or not A.is_floating_point() or A.shape[0] * B.shape[0] * A.shape[-1] <= _EXACT_ELEMENTS:
+        return ((A.unsqueeze(1) - B) ** 2).sum(2)
+    # ‖a‖² + ‖b‖² - 2ab by a GEMM, no [N, M, D] intermediate. Rounding may give tiny negatives, clamp them.
+    squaredA = (A * A).sum(-1, keepdim=True)
+    squaredB = (B * B).sum(-1)
+    if dtype is None or dtype == A.dtype:
+        return torch.addmm(squaredB, A, B.T, alpha=-2).add_(squaredA).clamp_min_(0)
+    cross = (A.to(dtype) @ B.to(dtype).T).to(A.dtype)
+    return (squaredA + squaredB).sub_(cross, alpha=2).clamp_min_(0)
@@ -1,8 +1,9 @@
 """Module of runtime utils"""
 import functools
-from typing import Callable, Union
+from typing import Any, Callable, Union
 from types import FunctionType, MethodType
 import os
+import atexit
 import logging
 from pprint import pformat
 import time
@@ -56,25 +57,43 @@ def preAllocateMem(memSize: int):
     """
     devices = torch.cuda.device_count()
     for d in range(devices):
-        x = torch.rand((256, 1024, memSize), device=f"cuda:{d}")
+        # Only the caching allocator's reservation matters, so skip filling the block.
+        x = torch.empty(memSize << 20, dtype=torch.uint8, device=f"cuda:{d}")
         del x
     return
 
 
+_nvmlHandles: List[Any] = list()
+_nvmlInitialized = False
+
+
+def _getNvmlHandles() -> List[Any]:
+    """Initialize NVML and resolve all device handles once per process."""
+    global _nvmlInitialized
+    if not _nvmlInitialized:
+        pynvml.nvmlInit()
+        atexit.register(pynvml.nvmlShutdown)
+        _nvmlHandles[:] = [pynvml.nvmlDeviceGetHandleByIndex(i) for i in range(pynvml.nvmlDeviceGetCount())]
+        _nvmlInitialized = True
+    return _nvmlHandles
+
+
+def _gpuMemory() -> List[Tuple[float, float]]:
+    """List (used, total) VRAM in MiB of all gpus, sorted by `CUDA_DEVICE_ORDER`."""
+    result = list()
+    for handle in _getNvmlHandles():
+        info = pynvml.nvmlDeviceGetMemoryInfo(handle)
+        result.append((info.used / 1048576, info.total / 1048576))
+    return result
+
+
 def gpuInfo() -> List[Dict[str, int]]:
     """Helper for list all gpus.
 
     Returns:
         List[Dict[str, int]]: A list of dicts { "memory.used": int, "memory.total": int }, sorted by `CUDA_DEVICE_ORDER`
     """
-    pynvml.nvmlInit()
-    deviceCount = pynvml.nvmlDeviceGetCount()
-    gpus = list()
-    for i in range(deviceCount):
-        handle = pynvml.nvmlDeviceGetHandleByIndex(i)
-        info = pynvml.nvmlDeviceGetMemoryInfo(handle)
-        gpus.append({"memory.used": info.used / 1048576, "memory.total": info.total / 1048576})
-    return gpus
+    return [{"memory.used": used, "memory.total": total} for used, total in _gpuMemory()]
 
 
 def queryGPU(wantsMore: bool = False, givenList: list = None, needGPUs: int = -1, needVRamEachGPU: int = -1, writeOSEnv: bool = True, logger: logging.Logger = None) -> List[Tuple[int, int]]:
@@ -116,11 +135,13 @@ def queryGPU(wantsMore: bool = False, givenList: list = None, needGPUs: int = -1
         List[Tuple[int, int]]: List of available gpu id and free VRAM.
     """
     logger = logger or logging
+    # `logging` module itself has no `isEnabledFor`, ask the root logger instead.
+    debugOn = (logger if hasattr(logger, "isEnabledFor") else logging.getLogger()).isEnabledFor(logging.DEBUG)
 
     # keep the devices order same as in nvidia-smi
     os.environ["CUDA_DEVICE_ORDER"] = "PCI_BUS_ID"
 
-    gpus = gpuInfo()
+    gpus = _gpuMemory()
     if needGPUs < 0:
         needGPUs = len(gpus)
 
@@ -131,34 +152,34 @@ def queryGPU(wantsMore: bool = False, givenList: list = None, needGPUs: int = -1
     else:
         it = range(len(gpus))
 
-    gpus = [(i, gpus[i]) for i in it]
-    if wantsMore:
-        gpus = sorted(gpus, key=lambda item: item[1]['memory.used'])
-
+    # No need to sort by usage when `wantsMore`: all GPUs are visited and the result is re-sorted by id.
     gpuList = []
-    for i, g in gpus:
+    for i in it:
+        used, total = gpus[i]
         if needVRamEachGPU < 0:
-            if g['memory.used'] < 1000:
-                # give space for basic vram
-                gpuList.append((i, (g['memory.total'] - g['memory.used'] - 1000)))
-                logger.debug("adding gpu[%d] with %.2fMB free.", i, g['memory.total'] - g['memory.used'])
-        elif g['memory.total'] - g['memory.used'] > needVRamEachGPU + 64:
-            gpuList.append((i, (g['memory.total'] - g['memory.used'] - 64)))
-            logger.debug("adding gpu[%d] with %.2fMB free.", i, g['memory.total'] - g['memory.used'])
+            # give space for basic vram
+            reserved = 1000 if used < 1000 else None
+        else:
+            reserved = 64 if total - used > needVRamEachGPU + 64 else None
+        if reserved is not None:
+            gpuList.append((i, (total - used - reserved)))
+            if debugOn:
+                logger.debug("adding gpu[%d] with %.2fMB free.", i, total - used)
         if len(gpuList) >= needGPUs and not wantsMore:
             break
 
     if len(gpuList) >= needGPUs:
         # keep order
         gpuList = sorted(gpuList, key=lambda item: item[0])
-        logger.debug("Found %d %s satisfied with args %s.", len(gpuList), "gpu" if len(gpuList) == 1 else "gpus", pformat(
-            {
-                "wantsMore": wantsMore,
-                "givenList": givenList,
-                "needGPUs": needGPUs,
-                "needVRamEachGPU": needVRamEachGPU
-            }, indent=4
-        ))
+        if debugOn:
+            logger.debug("Found %d %s satisfied with args %s.", len(gpuList), "gpu" if len(gpuList) == 1 else "gpus", pformat(
+                {
+                    "wantsMore": wantsMore,
+                    "givenList": givenList,
+                    "needGPUs": needGPUs,
+                    "needVRamEachGPU": needVRamEachGPU
+                }, indent=4
+            ))
         if writeOSEnv:
             os.environ["CUDA_VISIBLE_DEVICES"] = ",".join(map(str, [item[0] for item in gpuList]))
             newGPUList = []
@@ -194,10 +215,15 @@ class Timer:
     ```
     """
     def __init__(self):
-        self._initial = self._tick = time.time()
+        self._initial = self._tick = time.perf_counter_ns()
+
+    def tick(self) -> Tuple[float, float]:
+        interval, total = self.tick_ns()
+        return interval * 1e-9, total * 1e-9
 
-    def tick(self):
-        tock = time.time()
+    def tick_ns(self) -> Tuple[int, int]:
+        """Same as `tick`, but returns raw nanoseconds from a monotonic clock."""
+        tock = time.perf_counter_ns()
         interval = tock - self._tick
         self._tick = tock
-        return interval, self._tick - self._initial
+        return interval, tock - self._initial
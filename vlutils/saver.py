@@ -1,13 +1,21 @@
 """Module of Saver"""
-from typing import Any, Callable, Dict, Union, Optional
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Union, Optional
 import os
+import io
+import hashlib
+import copy
+import functools
+import itertools
+import re
+import struct
+import mmap
 import logging
 import shutil
 import datetime
 from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor
 
 import torch
-from tensorboard import program
 from torch.utils.tensorboard import SummaryWriter
 import yaml
 
@@ -18,10 +26,556 @@ from .types import StrPath
 from .runtime import relativePath
 
 __all__ = [
-    "Saver"
+    "Saver",
+    "loadCheckpoint"
 ]
 
 
+MapLocation = Union[None, Callable, str, torch.device, Dict[str, Any]]
+
+# Checkpoint layout:
+#   magic | header length (uint64, little-endian) | header | padding | payload
+# The header is a `torch.save`-ed dict, whose "objects" is the saved dict with every dense tensor
+#   replaced by a meta tensor (keeping dtype, shape, `requires_grad` and the `nn.Parameter` class), and "tensors"
+#   lists (offset, nbytes, device) of these placeholders in traversal order. The payload is raw bytes of all tensors,
+#   each aligned. Tensors sharing a storage (tied weights, views) share one region of the whole storage instead.
+# A sharded checkpoint keeps only the header, its payload is split into part files named uniquely
+#   per save, listed in the header's "parts".
+_CKPT_MAGIC = b"VLCKPT01"
+_CKPT_ALIGNMENT = 64
+# CUDA tensors smaller than it are gathered into one device-to-host transfer.
+_COALESCE_BYTES = 1 << 20
+# Limits of one vectored write.
+_IOV_MAX = os.sysconf("SC_IOV_MAX") if hasattr(os, "sysconf") and "SC_IOV_MAX" in os.sysconf_names else 1024
+_WRITE_BATCH_BYTES = 64 << 20
+# Use the libyaml emitter when PyYAML is built with it, it represents objects the same as `yaml.Dumper`.
+_Dumper = getattr(yaml, "CDumper", yaml.Dumper)
+# Digest of the source tree, placed in the dumped directory.
+_DUMP_HASH_NAME = ".dump.hash"
+
+
+def _align(size: int) -> int:
+    return (size + _CKPT_ALIGNMENT - 1) // _CKPT_ALIGNMENT * _CKPT_ALIGNMENT
+
+
+def _isRawTensor(value: Any) -> bool:
+    return isinstance(value, torch.Tensor) and value.layout == torch.strided and not value.is_quantized
+
+
+def _extractTensors(obj: Any, tensors: List[torch.Tensor]) -> Any:
+    """Replace dense tensors in nested dict/list/tuple by meta placeholders, collect them in `tensors`."""
+    if _isRawTensor(obj):
+        tensors.append(obj)
+        placeholder = torch.empty(obj.shape, dtype=obj.dtype, device="meta", requires_grad=obj.requires_grad)
+        if isinstance(obj, torch.nn.Parameter):
+            return torch.nn.Parameter(placeholder, obj.requires_grad)
+        return placeholder
+    if isinstance(obj, dict):
+        # shallow copy keeps the dict type and its attributes, e.g. `_metadata` of a state_dict.
+        result = copy.copy(obj)
+        for key, value in obj.items():
+            result[key] = _extractTensors(value, tensors)
+        return result
+    if type(obj) in (list, tuple):
+        return type(obj)(_extractTensors(x, tensors) for x in obj)
+    return obj
+
+
+def _fillTensors(obj: Any, fill: Callable[[torch.Tensor], torch.Tensor]) -> Any:
+    """Inverse of `_extractTensors`, `fill` is called on placeholders by traversal order."""
+    if isinstance(obj, torch.Tensor) and obj.is_meta:
+        return fill(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            obj[key] = _fillTensors(value, fill)
+        return obj
+    if type(obj) in (list, tuple):
+        return type(obj)(_fillTensors(x, fill) for x in obj)
+    return obj
+
+
+def _storageKey(tensor: torch.Tensor) -> Optional[tuple]:
+    """Identifies the storage of tensor, None for meta tensors and empty storages."""
+    if tensor.is_meta:
+        return None
+    storage = tensor.untyped_storage()
+    if storage.nbytes() == 0:
+        return None
+    return tensor.device, storage.data_ptr(), storage.nbytes()
+
+
+def _tensorBytes(tensor: torch.Tensor):
+    """A zero-copy buffer over the bytes of a cpu tensor."""
+    return tensor.detach().cpu().contiguous().view(-1).view(torch.uint8).numpy()
+
+
+def _stageToHost(tensors: List[torch.Tensor], pinnedPool: Optional[Dict[int, List[torch.Tensor]]] = None, copyHost: bool = False) -> List[Callable[[], Any]]:
+    """Issue device-to-host copies of all CUDA tensors at once, into pinned memory on side streams.
+
+    Small tensors on the same device are concatenated and copied in one transfer, large ones are copied individually.
+
+    Args:
+        tensors (List[torch.Tensor]): Tensors to stage.
+        pinnedPool (Dict[int, List[torch.Tensor]], optional): Pinned buffers by size, reused instead of allocating new ones and extended by new allocations. Buffers must not be in use by a former call. Defaults to None.
+        copyHost (bool, optional): Copy cpu tensors as well, instead of reading their memory in place. Defaults to False.
+
+    Returns:
+        List[Callable[[], Any]]: For each tensor, a function waits for its copy and returns a buffer over its bytes.
+    """
+    stages: List[Optional[Callable[[], Any]]] = [None] * len(tensors)
+    streams: Dict[torch.device, torch.cuda.Stream] = dict()
+    small: Dict[torch.device, List[int]] = dict()
+    large: List[int] = list()
+    for i, tensor in enumerate(tensors):
+        if not tensor.is_cuda:
+            stages[i] = functools.partial(_tensorBytes, tensor.detach().clone() if copyHost else tensor)
+        elif tensor.numel() * tensor.element_size() < _COALESCE_BYTES:
+            small.setdefault(tensor.device, list()).append(i)
+        else:
+            large.append(i)
+        if tensor.is_cuda and tensor.device not in streams:
+            stream = streams[tensor.device] = torch.cuda.Stream(tensor.device)
+            # Wait for pending kernels that produce these tensors.
+            stream.wait_stream(torch.cuda.current_stream(tensor.device))
+
+    pinnedPool = dict() if pinnedPool is None else pinnedPool
+    # How many buffers of each size are taken in this call.
+    taken: Dict[int, int] = dict()
+
+    def _copy(source: torch.Tensor, stream: torch.cuda.Stream):
+        nbytes = source.numel()
+        buffers = pinnedPool.setdefault(nbytes, list())
+        index = taken.get(nbytes, 0)
+        taken[nbytes] = index + 1
+        if index == len(buffers):
+            buffers.append(torch.empty(nbytes, dtype=torch.uint8, pin_memory=True))
+        host = buffers[index]
+        host.copy_(source, non_blocking=True)
+        event = torch.cuda.Event()
+        event.record(stream)
+        return event, host
+
+    # Coalesced copies go first, small tensors are spread all over the checkpoint.
+    for device, indices in small.items():
+        stream = streams[device]
+        with torch.cuda.stream(stream):
+            event, host = _copy(torch.cat([tensors[i].detach().contiguous().view(-1).view(torch.uint8) for i in indices]), stream)
+        offset = 0
+        for i in indices:
+            nbytes = tensors[i].numel() * tensors[i].element_size()
+            stages[i] = functools.partial(_waitHost, event, host[offset:offset + nbytes])
+            offset += nbytes
+    for i in large:
+        stream = streams[tensors[i].device]
+        with torch.cuda.stream(stream):
+            event, host = _copy(tensors[i].detach().contiguous().view(-1).view(torch.uint8), stream)
+        stages[i] = functools.partial(_waitHost, event, host)
+    return stages
+
+
+def _waitHost(event: torch.cuda.Event, host: torch.Tensor):
+    event.synchronize()
+    return host.numpy()
+
+
+def _restoreLocation(mapLocation: MapLocation) -> Callable[[Any, str], Any]:
+    """Map storages the same way as `torch.load(map_location=mapLocation)`, but keep meta placeholders as is."""
+    def restore(storage, location: str):
+        if location == "meta":
+            return storage
+        if mapLocation is None:
+            target = location
+        elif isinstance(mapLocation, (str, torch.device)):
+            target = str(mapLocation)
+        elif isinstance(mapLocation, dict):
+            target = mapLocation.get(location, location)
+        else:
+            result = mapLocation(storage, location)
+            if result is not None:
+                return result
+            target = location
+        return torch.serialization.default_restore_location(storage, target)
+    return restore
+
+
+def _castTensor(tensor: torch.Tensor, dtype: torch.dtype) -> Tuple[torch.Tensor, Optional[float]]:
+    """Cast a floating tensor to dtype for storage, 8-bit floats are scaled into their range by `amax`.
+
+    Returns:
+        Tuple[torch.Tensor, Optional[float]]: The casted tensor and the scale to multiply back, None if not scaled.
+    """
+    if torch.finfo(dtype).bits > 8:
+        return tensor.to(dtype), None
+    scale = tensor.detach().abs().amax().item() / torch.finfo(dtype).max if tensor.numel() > 0 else 0.
+    scale = scale or 1.
+    return (tensor.detach() / scale).to(dtype), scale
+
+
+def _writeCheckpoint(path: StrPath, saveDict: Dict[str, Any], pinnedPool: Optional[Dict[int, List[torch.Tensor]]] = None, numShards: int = 1, dtype: Optional[torch.dtype] = None, executor: Optional[ThreadPoolExecutor] = None, castKeys: Optional[Iterable[str]] = None) -> Optional[Future]:
+    """Write `saveDict` to path, if `executor` is given, only file writes are left to it and their future is returned.
+
+    With `dtype`, floating tensors under `castKeys` (all keys if None) are stored in it, except scalars, parameters and tensors sharing a storage.
+    """
+    tensors = list()
+    # Placeholders keep the original dtype, they are casted back on load.
+    skeleton = dict()
+    castable: List[bool] = list()
+    castKeys = saveDict.keys() if castKeys is None else set(castKeys)
+    for key, value in saveDict.items():
+        start = len(tensors)
+        skeleton[key] = _extractTensors(value, tensors)
+        castable.extend([key in castKeys] * (len(tensors) - start))
+    keys = [_storageKey(tensor) for tensor in tensors]
+    storageCounts: Dict[tuple, int] = dict()
+    for key in keys:
+        if key is not None:
+            storageCounts[key] = storageCounts.get(key, 0) + 1
+    casts: List[Optional[Tuple[torch.dtype, Optional[float]]]] = [None] * len(tensors)
+    if dtype is not None:
+        for i, tensor in enumerate(tensors):
+            # Scalars are counters like optimizer steps, which must stay exact. Shared storages must stay shared.
+            if castable[i] and tensor.is_floating_point() and tensor.dtype != dtype and tensor.dim() > 0 and not tensor.is_meta and not isinstance(tensor, torch.nn.Parameter) and storageCounts.get(keys[i], 0) < 2:
+                tensors[i], scale = _castTensor(tensor, dtype)
+                casts[i] = (dtype, scale)
+    # Tensors sharing a storage are written once as bytes of the whole storage, and restored as views of it.
+    written: List[torch.Tensor] = list()
+    sources: List[int] = list()
+    views: List[Optional[Tuple[int, Tuple[int, ...]]]] = list()
+    regions: Dict[tuple, int] = dict()
+    for tensor, key in zip(tensors, keys):
+        if storageCounts.get(key, 0) < 2:
+            sources.append(len(written))
+            written.append(tensor)
+            views.append(None)
+            continue
+        if key not in regions:
+            regions[key] = len(written)
+            written.append(torch.empty(0, dtype=torch.uint8, device=tensor.device).set_(tensor.untyped_storage()))
+        sources.append(regions[key])
+        views.append((tensor.storage_offset(), tensor.stride()))
+    # Copies run in background while building header and writing former tensors.
+    stages = _stageToHost(written, pinnedPool, copyHost=executor is not None)
+    numShards = max(1, min(numShards, len(written), os.cpu_count() or 1))
+    sizes = [0 if tensor.is_meta else tensor.numel() * tensor.element_size() for tensor in written]
+    # Greedily put the largest remaining tensor into the lightest shard.
+    assigned = [0] * len(written)
+    if numShards > 1:
+        loads = [0] * numShards
+        for i in sorted(range(len(written)), key=sizes.__getitem__, reverse=True):
+            shard = loads.index(min(loads))
+            assigned[i] = shard
+            loads[shard] += _align(sizes[i])
+    offsets = [0] * numShards
+    starts = [0] * len(written)
+    for i, (nbytes, shard) in enumerate(zip(sizes, assigned)):
+        starts[i] = offsets[shard]
+        offsets[shard] += _align(nbytes)
+    entries: List[Tuple[Any, ...]] = list()
+    # (offset, nbytes, device[, shard[, stored dtype, scale[, (storage offset, stride)]]])
+    for tensor, source, view, cast in zip(tensors, sources, views, casts):
+        if tensor.is_meta:
+            entries.append((-1, 0, "meta"))
+            continue
+        shard = assigned[source]
+        entry = (starts[source], sizes[source], str(tensor.device))
+        if view is not None:
+            entry += (shard, tensor.dtype, None, view)
+        elif cast is not None:
+            entry += (shard, ) + cast
+        elif numShards > 1:
+            entry += (shard, )
+        entries.append(entry)
+    headerDict = {"objects": skeleton, "tensors": entries}
+    if numShards > 1:
+        # Parts are named uniquely per save, so the former header never refers to parts of this save.
+        tag = os.urandom(4).hex()
+        partPaths = [_shardPath(path, shard, tag) for shard in range(numShards)]
+        headerDict["shards"] = numShards
+        headerDict["parts"] = [os.path.basename(partPath) for partPath in partPaths]
+    with io.BytesIO() as buffer:
+        torch.save(headerDict, buffer)
+        header = buffer.getvalue()
+    headerEnd = len(_CKPT_MAGIC) + 8 + len(header)
+    headerBytes = _CKPT_MAGIC + struct.pack("<Q", len(header)) + header
+
+    def _buffers(shard: int):
+        for stage, nbytes, target in zip(stages, sizes, assigned):
+            if nbytes > 0 and target == shard:
+                yield stage()
+                yield bytes(_align(nbytes) - nbytes)
+
+    def _write():
+        # `os.replace` is atomic, a crash never leaves a half-written checkpoint at path, and readers holding the old file keep it intact.
+        if numShards < 2:
+            os.replace(_writeTemp(path, itertools.chain([headerBytes + bytes(_align(headerEnd) - headerEnd)], _buffers(0)), _align(headerEnd) + offsets[0]), path)
+            _removeStaleParts(path)
+            return
+
+        # Each shard has its own writer. The header is replaced at last, which switches to the new parts at once, then former parts are removed.
+        with ThreadPoolExecutor(max_workers=numShards) as pool:
+            temps = [pool.submit(lambda shard: _writeTemp(partPaths[shard], _buffers(shard), offsets[shard]), shard) for shard in range(numShards)]
+            temps = [temp.result() for temp in temps]
+        for temp, partPath in zip(temps, partPaths):
+            os.replace(temp, partPath)
+        os.replace(_writeTemp(path, [headerBytes]), path)
+        _removeStaleParts(path, headerDict["parts"])
+
+    if executor is None:
+        _write()
+        return None
+    # Tensors may be modified as soon as this returns, so wait for all copies here and hand over only the host bytes.
+    stages = [functools.partial(lambda buffer: buffer, stage()) for stage in stages]
+    return executor.submit(_write)
+
+
+def _writeTemp(path: StrPath, buffers: Iterable[Any], size: int = 0) -> str:
+    """Write buffers to a temporary file beside path and flush it to disk, to be moved onto path by `os.replace`.
+
+    If `size` (total bytes of buffers) is given, the file is allocated up front so writes do not wait for block allocation.
+    """
+    temp = f"{path}.tmp"
+    with open(temp, "wb", buffering=0) as fp:
+        if size > 0 and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(fp.fileno(), 0, size)
+            except OSError:
+                # Not supported by the file system, blocks are allocated by writes as usual.
+                pass
+        _writeBuffers(fp, buffers)
+        os.fsync(fp.fileno())
+    return temp
+
+
+def _shardPath(path: StrPath, shard: int, tag: str) -> str:
+    return f"{path}.{tag}.part{shard}"
+
+
+def _removeStaleParts(path: StrPath, keep: Iterable[str] = ()):
+    """Remove part files (and their leftover temporary files) of former saves to path, except those named in `keep`."""
+    directory, name = os.path.split(os.path.abspath(path))
+    pattern = re.compile(re.escape(name) + r"(\.[0-9a-f]+)?\.part[0-9]+(\.tmp)?")
+    keep = set(keep)
+    with os.scandir(directory) as it:
+        stale = [entry.path for entry in it if entry.name not in keep and pattern.fullmatch(entry.name)]
+    for stalePath in stale:
+        try:
+            os.remove(stalePath)
+        except FileNotFoundError:
+            pass
+
+
+def _writeBuffers(fp: io.FileIO, buffers: Iterable[Any]):
+    """Write all buffers sequentially, gathered into vectored `pwritev` calls where supported."""
+    if not hasattr(os, "pwritev"):
+        # Paddings and small tensors are merged by a large buffer, large tensors bypass it.
+        writer = io.BufferedWriter(fp, buffer_size=_WRITE_BATCH_BYTES)
+        for buffer in buffers:
+            writer.write(memoryview(buffer).cast("B"))
+        writer.flush()
+        writer.detach()
+        return
+    fd = fp.fileno()
+    position = 0
+    batch = list()
+    batchBytes = 0
+    for buffer in itertools.chain(buffers, [None]):
+        if buffer is not None:
+            view = memoryview(buffer).cast("B")
+            if not view:
+                continue
+            batch.append(view)
+            batchBytes += len(view)
+        if batch and (buffer is None or len(batch) >= _IOV_MAX or batchBytes >= _WRITE_BATCH_BYTES):
+            written = os.pwritev(fd, batch, position)
+            position += written
+            # Rarely happens, write the rest one by one.
+            if written < batchBytes:
+                for view in batch:
+                    if written >= len(view):
+                        written -= len(view)
+                        continue
+                    view = view[written:]
+                    written = 0
+                    while view:
+                        wrote = os.pwrite(fd, view, position)
+                        view = view[wrote:]
+                        position += wrote
+            batch.clear()
+            batchBytes = 0
+
+
+def _readPayload(path: StrPath, start: int = 0) -> Union[bytearray, memoryview]:
+    """Bytes of path from start, loaded tensors share memory with it."""
+    with open(path, "rb") as fp:
+        size = os.fstat(fp.fileno()).st_size
+        if size <= start:
+            return bytearray()
+        if os.name == "posix":
+            # A private mapping reads pages on first touch and copies them only if tensors are modified in place.
+            # Saves replace the file instead of overwriting it, so the mapped content never changes under loaded tensors.
+            return memoryview(mmap.mmap(fp.fileno(), size, access=mmap.ACCESS_COPY))[start:]
+        # Mapped files could not be replaced on other platforms.
+        fp.seek(start)
+        payload = bytearray(size - start)
+        fp.readinto(payload)
+    return payload
+
+
+def _readCheckpoint(path: StrPath, mapLocation: MapLocation = None) -> Dict[str, Any]:
+    with open(path, "rb") as fp:
+        if fp.read(len(_CKPT_MAGIC)) != _CKPT_MAGIC:
+            # Checkpoints saved by `torch.save`
+            fp.seek(0)
+            return torch.load(fp, map_location=mapLocation)
+        headerLength, = struct.unpack("<Q", fp.read(8))
+        restore = _restoreLocation(mapLocation)
+        header = torch.load(io.BytesIO(fp.read(headerLength)), map_location=restore)
+    numShards = header.get("shards", 1)
+    if numShards > 1:
+        directory = os.path.dirname(os.path.abspath(path))
+        with ThreadPoolExecutor(max_workers=numShards) as pool:
+            payloads = list(pool.map(_readPayload, [os.path.join(directory, name) for name in header["parts"]]))
+    else:
+        payloads = [_readPayload(path, _align(len(_CKPT_MAGIC) + 8 + headerLength))]
+
+    entries = iter(header["tensors"])
+    # Regions shared by views, restored once so the views keep sharing the storage.
+    shared: Dict[Tuple[int, int], Any] = dict()
+
+    def fill(placeholder: torch.Tensor) -> torch.Tensor:
+        offset, nbytes, location, *extra = next(entries)
+        if location == "meta":
+            return placeholder
+        shard, storedDtype, scale, view = extra + [0, placeholder.dtype, None, None][len(extra):]
+        storage = shared.get((shard, offset)) if view is not None else None
+        if storage is None:
+            if nbytes > 0:
+                storage = torch.frombuffer(payloads[shard], dtype=torch.uint8, count=nbytes, offset=offset).untyped_storage()
+            else:
+                storage = torch.UntypedStorage(0)
+            storage = restore(storage, location)
+            if view is not None:
+                shared[(shard, offset)] = storage
+        storageOffset, stride = (0, None) if view is None else view
+        tensor = torch.empty(0, dtype=storedDtype, device=storage.device).set_(storage, storageOffset, placeholder.shape, stride)
+        if storedDtype != placeholder.dtype:
+            tensor = tensor.to(placeholder.dtype)
+            if scale is not None:
+                tensor.mul_(scale)
+        if isinstance(placeholder, torch.nn.Parameter):
+            return torch.nn.Parameter(tensor, placeholder.requires_grad)
+        if placeholder.requires_grad:
+            tensor.requires_grad_()
+        return tensor
+
+    return _fillTensors(header["objects"], fill)
+
+
+def loadCheckpoint(filePath: StrPath, mapLocation: MapLocation = None) -> Dict[str, Any]:
+    """Load all saved items of a checkpoint written by `Saver.save`, without a `Saver`.
+
+    Checkpoints of the default raw format are not readable by `torch.load`, scripts reading them should use this function.
+        Checkpoints written by `torch.save` (also by `Saver.save(..., format="torch")`) are loaded by `torch.load`.
+        Tensors of raw checkpoints share memory with the file mapping, they are not resizable (e.g. by `resize_`), `clone()` them if needed.
+
+    Args:
+        filePath (str): The checkpoint path.
+        mapLocation (Dict[str, str], optional): See torch.load(mapLocation). Defaults to None.
+
+    Returns:
+        Dict[str, Any]: All saved items by their names.
+    """
+    return _readCheckpoint(filePath, mapLocation)
+
+
+def _writeTorchCheckpoint(path: StrPath, saveDict: Dict[str, Any]):
+    # Atomically replaced as raw checkpoints.
+    temp = f"{path}.tmp"
+    torch.save(saveDict, temp)
+    os.replace(temp, path)
+    _removeStaleParts(path)
+
+
+def _stateOf(value: Any) -> Any:
+    """The state-dict of value if it has, otherwise value itself."""
+    # Look up on the type, that is a plain class-dict walk instead of instance attribute resolution.
+    if getattr(type(value), "state_dict", None) is not None:
+        return value.state_dict()
+    return value
+
+
+def _restoreInto(savedDict: Dict[str, Any], strict: bool, objs: Dict[str, Any]) -> Dict[str, Any]:
+    """Load `savedDict[key]` into each object in `objs` by its `load_state_dict()`, or place the loaded item into `objs`."""
+    for key, value in objs.items():
+        stateDict = savedDict[key]
+        hasLoader = getattr(type(value), "load_state_dict", None) is not None
+        if isinstance(value, torch.nn.Module):
+            value.load_state_dict(stateDict, strict=strict)
+        elif hasLoader:
+            value.load_state_dict(stateDict)
+        elif isinstance(value, torch.Tensor):
+            value.data = stateDict
+        else:
+            objs[key] = stateDict
+    return objs
+
+
+def _treeHash(root: StrPath) -> str:
+    """A digest over relative paths and contents of all files under root, `__pycache__` excluded. Symlinks are hashed by their targets."""
+    digest = hashlib.blake2b(digest_size=16)
+    pending = [str(root)]
+    while pending:
+        with os.scandir(pending.pop()) as it:
+            entries = sorted(it, key=lambda entry: entry.path)
+        for entry in entries:
+            if entry.name == "__pycache__":
+                continue
+            digest.update(f"{os.path.relpath(entry.path, root)}\0".encode())
+            if entry.is_symlink():
+                digest.update(f"->{os.readlink(entry.path)}\n".encode())
+            elif entry.is_dir():
+                digest.update(b"/\n")
+                pending.append(entry.path)
+            else:
+                # Contents instead of mtimes, edits keeping the size and mtime are still noticed.
+                with open(entry.path, "rb") as fp:
+                    while True:
+                        chunk = fp.read(1 << 20)
+                        if not chunk:
+                            break
+                        digest.update(chunk)
+                    digest.update(f"\0{fp.tell()}\n".encode())
+    return digest.hexdigest()
+
+
+def _copyTree(source: StrPath, target: StrPath):
+    """Copy source to target as `shutil.copytree(source, target, symlinks=True)` without `__pycache__`.
+
+    Directories are created by walking the tree, files are copied in parallel since dumps are mostly small files.
+    Stats of directories are copied at last, after all files in them are written.
+    """
+    directories = list()
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as pool:
+        copies = list()
+        for root, dirNames, fileNames in os.walk(source):
+            targetRoot = os.path.normpath(os.path.join(target, os.path.relpath(root, source)))
+            os.makedirs(targetRoot)
+            directories.append((root, targetRoot))
+            # Links to directories are listed in `dirNames` but not walked into.
+            links = [name for name in itertools.chain(dirNames, fileNames) if os.path.islink(os.path.join(root, name))]
+            dirNames[:] = [name for name in dirNames if name != "__pycache__" and name not in links]
+            for name in links:
+                os.symlink(os.readlink(os.path.join(root, name)), os.path.join(targetRoot, name))
+            for name in fileNames:
+                if name not in links:
+                    copies.append(pool.submit(shutil.copy2, os.path.join(root, name), os.path.join(targetRoot, name)))
+        for copied in copies:
+            copied.result()
+    # Deepest first, creating entries updates the mtime of its parent.
+    for sourceDir, targetDir in reversed(directories):
+        shutil.copystat(sourceDir, targetDir)
+
+
 class Saver(SummaryWriter, LoggerBase):
     """A class for load and save model
 
@@ -45,6 +599,8 @@ class Saver(SummaryWriter, LoggerBase):
         dumpFile (str, optional): The path of any folder want to save.
     """
     NewestDir = "latest"
+    # Set while `SummaryWriter.__init__` runs, see `_get_file_writer`.
+    _deferWriter = False
 
     @staticmethod
     def composePath(saveDir: StrPath, saveName: StrPath = "saved.ckpt", autoManage: bool = True):
@@ -61,17 +617,29 @@ class Saver(SummaryWriter, LoggerBase):
             autoManage = False
 
         if autoManage:
-            if os.path.exists(os.path.join(saveDir, self.NewestDir)) and not reserve:
+            latestDir = os.path.join(saveDir, self.NewestDir)
+            # One syscall each, instead of `exists` + `move` and `makedirs(exist_ok=True)` that stats again.
+            if not reserve:
                 newDir = os.path.join(saveDir, datetime.datetime.now().strftime(r"%y%m%d-%H%M%S"))
-                shutil.move(os.path.join(saveDir, self.NewestDir), newDir)
-                # self.debug("Auto rename %s to %s", os.path.join(saveDir, self.NewestDir), newDir)
-            os.makedirs(os.path.join(saveDir, self.NewestDir), exist_ok=True)
+                try:
+                    shutil.move(latestDir, newDir)
+                    # self.debug("Auto rename %s to %s", latestDir, newDir)
+                except FileNotFoundError:
+                    pass
+            try:
+                os.makedirs(latestDir)
+            except FileExistsError:
+                pass
             if maxItems > 0:
                 rotateItems(saveDir, maxItems)
-            self._saveDir = os.path.join(saveDir, self.NewestDir)
+            self._saveDir = latestDir
         else:
             self._saveDir = saveDir
-        SummaryWriter.__init__(self, self._saveDir)
+        self._deferWriter = True
+        try:
+            SummaryWriter.__init__(self, self._saveDir)
+        finally:
+            self._deferWriter = False
 
         logger = configLogging(self.SaveDir, loggerName, loggingLevel, rotateLogs=-1)
         self.Logger = logger
@@ -91,13 +659,20 @@ class Saver(SummaryWriter, LoggerBase):
 
         if config is not None:
             with open(os.path.join(self._saveDir, "config.yaml"), "w") as fp:
-                yaml.dump(config, fp)
+                yaml.dump(config, fp, Dumper=_Dumper)
         if dumpFile is not None and not str.isspace(dumpFile) and os.path.exists(dumpFile):
             self._dumpFile(dumpFile)
 
         self._infoCounter = 0
+        # Pinned staging buffers of `save`, checkpoints mostly keep the same shapes so they are reused across calls.
+        self._pinnedPool: Dict[int, List[torch.Tensor]] = dict()
+        # Background writer of `save(..., asynchronous=True)`, created on first use.
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._pendingSave: Optional[Future] = None
 
         if activateTensorboard:
+            # Pulls in the whole web server stack, only imported when launching.
+            from tensorboard import program
             tb = program.TensorBoard()
             tb.configure(argv=[None, "--logdir", self._saveDir, "--load_fast", "false"])
             url = tb.launch()
@@ -136,7 +711,21 @@ class Saver(SummaryWriter, LoggerBase):
         # self.log = self._logger.log
 
     def _dumpFile(self, path: StrPath):
-        shutil.copytree(path, os.path.join(self._saveDir, "dump"), symlinks=True, ignore=lambda src, path: [x for x in path if x == "__pycache__"], ignore_dangling_symlinks=True)
+        dumpDir = os.path.join(self._saveDir, "dump")
+        # Kept inside the dump and written after all copies, so it only exists beside a complete dump.
+        hashFile = os.path.join(dumpDir, _DUMP_HASH_NAME)
+        treeHash = _treeHash(path)
+        # Resumed in the same directory with unchanged sources, nothing to copy.
+        if os.path.isfile(hashFile):
+            with open(hashFile, "r") as fp:
+                if fp.read() == treeHash:
+                    self.debug("Skip dumping unchanged %s", relativePath(path))
+                    return
+        if os.path.lexists(dumpDir):
+            shutil.rmtree(dumpDir)
+        _copyTree(path, dumpDir)
+        with open(hashFile, "w") as fp:
+            fp.write(treeHash)
 
     @property
     def SaveDir(self) -> Path:
@@ -154,33 +743,81 @@ class Saver(SummaryWriter, LoggerBase):
         Args:
             dest (str): The path of destination dir, execute by shutil.move().
         """
-        self.flush()
-        self.close()
+        self._waitSave()
+        # Event files are flushed and closed, the writer reopens in the new place on the next summary.
+        # `Saver.close` is not used, so pinned buffers and the background writer are kept for further saves.
+        SummaryWriter.close(self)
         shutil.move(self._saveDir, dest)
         self._saveDir = dest
         self._savePath = os.path.join(dest, self.SavePath.name)
         self.log_dir = self._saveDir
 
-    def save(self, path: StrPath = None, **objs: Any):
+    def save(self, path: StrPath = None, numShards: int = 1, dtype: Optional[torch.dtype] = None, asynchronous: bool = False, format: str = "raw", **objs: Any) -> Optional[Future]:
         """Save anything
 
+        Tensors (also those inside nested dicts, lists and tuples) are written as raw bytes after a small header,
+            other objects are pickled by `torch.save` within the header. Checkpoints written by `torch.save` could still be loaded.
+        NOTE: Raw checkpoints can not be read by `torch.load`, use `Saver.load` or `vlutils.saver.loadCheckpoint`, or save with `format="torch"` for other readers.
+
         Args:
+            path (str, optional): Where to save. Defaults to `self.SavePath`.
+            numShards (int, optional): If > 1, tensor bytes are balanced into part files beside `path` written in parallel, and `path` only keeps the header, which is replaced at last. Parts of former saves are removed. Capped by the cpu count. Defaults to 1.
+            dtype (torch.dtype, optional): A floating dtype. If given, non-parameter floating tensors, e.g. optimizer states, are stored in this dtype and casted back to their own dtype on load. Modules, `nn.Parameter`s and 0-dim tensors are kept as is. Lossy, e.g. `torch.bfloat16` halves the size of float32 tensors, 8-bit floats are additionally scaled per tensor. Defaults to None.
+            asynchronous (bool, optional): If True, return once tensors are copied to host, and write the file in a background thread. The next `save`, `moveTo` or `close` waits for it. Defaults to False.
+            format (str, optional): "raw", or "torch" to write by `torch.save` as former versions, which `numShards`, `dtype` and `asynchronous` are not supported by. Defaults to "raw".
             **objs (Any): The saved items ordered by names.
+
+        Returns:
+            Optional[Future]: If `asynchronous`, a future resolved when the checkpoint is written, otherwise None.
         """
-        saveDict = dict()
-        for key, value in objs.items():
-            if isinstance(value, torch.nn.Module):
-                saveDict[key] = value.state_dict()
-            elif hasattr(value, "state_dict"):
-                saveDict[key] = value.state_dict()
-            else:
-                saveDict[key] = value
-        torch.save(saveDict, path or self._savePath)
-        self.debug("Successfully saved checkpoint with keys: %s", list(saveDict.keys()))
+        if dtype is not None and not (isinstance(dtype, torch.dtype) and dtype.is_floating_point):
+            raise TypeError(f"`dtype` should be a floating torch.dtype, got {dtype!r}.")
+        if format not in ("raw", "torch"):
+            raise ValueError(f"`format` should be \"raw\" or \"torch\", got {format!r}.")
+        if format == "torch" and (numShards > 1 or dtype is not None or asynchronous):
+            raise ValueError("`numShards`, `dtype` and `asynchronous` are only supported by the raw format.")
+        # Pinned buffers are reused, so the former background write must finish first.
+        self._waitSave()
+        saveDict = {key: _stateOf(value) for key, value in objs.items()}
+        if format == "torch":
+            _writeTorchCheckpoint(path or self._savePath, saveDict)
+            self.debug("Successfully saved checkpoint with keys: %s", list(saveDict.keys()))
+            return None
+        # Parameters of modules are kept in full precision.
+        castKeys = [key for key, value in objs.items() if not isinstance(value, torch.nn.Module)]
+        if not asynchronous:
+            _writeCheckpoint(path or self._savePath, saveDict, self._pinnedPool, numShards, dtype, castKeys=castKeys)
+            self.debug("Successfully saved checkpoint with keys: %s", list(saveDict.keys()))
+            return None
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Saver")
+        self._pendingSave = _writeCheckpoint(path or self._savePath, saveDict, self._pinnedPool, numShards, dtype, self._writer, castKeys)
+        self.debug("Saving checkpoint with keys: %s in background", list(saveDict.keys()))
+        return self._pendingSave
+
+    def _waitSave(self):
+        if self._pendingSave is not None:
+            pending, self._pendingSave = self._pendingSave, None
+            pending.result()
+
+    def _get_file_writer(self):
+        # `SummaryWriter` opens an event file with a writer thread on construction, defer it to the first summary written.
+        if self._deferWriter:
+            return None
+        return super()._get_file_writer()
+
+    def close(self):
+        self._waitSave()
+        if self._writer is not None:
+            self._writer.shutdown()
+            self._writer = None
+        super().close()
+        # Give back page-locked memory held for `save`, it is re-pinned if saving again.
+        self._pinnedPool.clear()
 
     @staticmethod
-    def load(filePath: StrPath, mapLocation: Union[None, Callable, str, torch.device, Dict[str, Any]] = None, strict: bool = True, logger: Optional[Union[logging.Logger, "Saver"]] = None, **objs: Any) -> Dict[str, Any]:
-        """Load from ckpt.
+    def load(filePath: StrPath, mapLocation: MapLocation = None, strict: bool = True, logger: Optional[Union[logging.Logger, "Saver"]] = None, **objs: Any) -> Dict[str, Any]:
+        """Load from ckpt, see `loadCheckpoint` for checkpoints of both formats.
 
         Args:
             filePath (str): The destination path to load ckpt.
@@ -192,21 +829,10 @@ class Saver(SummaryWriter, LoggerBase):
         Returns:
             Dict[str, Any]: The loaded dict.
         """
-        savedDict = torch.load(filePath, map_location=mapLocation)
+        savedDict = loadCheckpoint(filePath, mapLocation)
         logger = logger or logging
         logger.debug("Load state_dict with keys:\r\n%s", savedDict.keys())
-        for key, value in objs.items():
-            stateDict = savedDict[key]
-            if isinstance(value, torch.nn.Module):
-                value.load_state_dict(stateDict, strict=strict)
-            elif callable(getattr(value, "load_state_dict", None)):
-                value.load_state_dict(stateDict)
-            else:
-                if isinstance(value, torch.Tensor):
-                    value.data = stateDict
-                else:
-                    objs[key] = stateDict
-        return objs
+        return _restoreInto(savedDict, strict, objs)
 
 
 class DummySaver(Saver):
@@ -277,21 +903,9 @@ class DummySaver(Saver):
     def moveTo(self, dest: StrPath):
         raise NotImplementedError("Dummy saver does not implement `moveTo` function.")
 
-    def save(self, path: StrPath = None, **objs: Any):
+    def save(self, path: StrPath = None, numShards: int = 1, dtype: Optional[torch.dtype] = None, asynchronous: bool = False, format: str = "raw", **objs: Any) -> Optional[Future]:
         raise NotImplementedError("Dummy saver does not implement `save` function.")
 
     @staticmethod
     def load(filePath: StrPath, mapLocation: Dict[str, str] = None, strict: bool = True, logger: logging.Logger = None, **objs: Any) -> Dict[str, Any]:
-        savedDict = torch.load(filePath, map_location=mapLocation)
-        for key, value in objs.items():
-            stateDict = savedDict[key]
-            if isinstance(value, torch.nn.Module):
-                value.load_state_dict(stateDict, strict=strict)
-            elif callable(getattr(value, "load_state_dict", None)):
-                value.load_state_dict(stateDict)
-            else:
-                if isinstance(value, torch.Tensor):
-                    value.data = stateDict
-                else:
-                    objs[key] = stateDict
-        return objs
+        return _restoreInto(loadCheckpoint(filePath, mapLocation), strict, objs)
@@ -1,7 +1,14 @@
 from typing import Any
 import re
 import yaml
-from io import StringIO
+
+
+__all__ = [
+    "DefaultGroup",
+    "DefaultCommandFormatter",
+    "strNoneorEmpty",
+    "pPrint"
+]
 
 
 """https://github.com/click-contrib/click-default-group/blob/master/click_default_group.py
@@ -114,36 +121,45 @@ class DefaultCommandFormatter(object):
         self.mark = mark
 
     def __getattr__(self, attr):
-        return getattr(self.formatter, attr)
+        value = getattr(self.formatter, attr)
+        # Keep bound methods for later lookups, plain values like `current_indent` change and are always forwarded.
+        if callable(value):
+            setattr(self, attr, value)
+        return value
 
     def write_dl(self, rows, *args, **kwargs):
+        default_rows = []
         rows_ = []
         for cmd_name, help in rows:
             if cmd_name == self.group.default_cmd_name:
-                rows_.insert(0, (cmd_name + self.mark, help))
+                default_rows.append((cmd_name + self.mark, help))
             else:
                 rows_.append((cmd_name, help))
-        return self.formatter.write_dl(rows_, *args, **kwargs)
+        # Marked rows go first, prepended once.
+        return self.formatter.write_dl(default_rows[::-1] + rows_, *args, **kwargs)
 
 
 def strNoneorEmpty(string: Any):
     return string is None or not (string or string.strip())
 
+_yamlKey = re.compile(r'^\s*[\S]+:', re.MULTILINE)
+# Whitespace and keys never span lines, the same as matching each line on its own.
+_yamlLineAlignColons = re.compile(r'^([^\S\n]*.+?[^:#\n]): [^\S\n]*(.*)', re.MULTILINE)
+_yamlLine = re.compile(r'^([^\S\n]*.+?[^:#\n]: )[^\S\n]*(.*)', re.MULTILINE)
+
 def _alignYAML(str, pad=0, aligned_colons=False):
-    props = re.findall(r'^\s*[\S]+:', str, re.MULTILINE)
+    props = _yamlKey.findall(str)
     if not props:
         return str
-    longest = max([len(i) for i in props]) + pad
+    longest = max(map(len, props)) + pad
     if aligned_colons:
-        return ''.join([i+'\n' for i in map(
-                    lambda str: re.sub(r'^(\s*.+?[^:#]): \s*(.*)',
-                        lambda m: m.group(1) + ''.ljust(longest-len(m.group(1))-1-pad) + ':'.ljust(pad+1) + m.group(2), str, re.MULTILINE),
-                    str.split('\n'))])
+        colon = ':'.ljust(pad+1)
+        return _yamlLineAlignColons.sub(lambda m: m.group(1) + ''.ljust(longest-len(m.group(1))-1-pad) + colon + m.group(2), str) + '\n'
     else:
-        return ''.join([i+'\n' for i in map(
-                    lambda str: re.sub(r'^(\s*.+?[^:#]: )\s*(.*)',
-                        lambda m: m.group(1) + ''.ljust(longest-len(m.group(1))+1) + m.group(2), str, re.MULTILINE),
-                    str.split('\n'))])
+        return _yamlLine.sub(lambda m: m.group(1) + ''.ljust(longest-len(m.group(1))+1) + m.group(2), str) + '\n'
+
+# Use the libyaml emitter when PyYAML is built with it.
+_SafeDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
 
 def pPrint(d: dict) -> str:
     """Print dict prettier.
@@ -154,6 +170,4 @@ def pPrint(d: dict) -> str:
     Returns:
         str: Resulting string.
     """
-    with StringIO() as stream:
-        yaml.safe_dump(d, stream, default_flow_style=False)
-        return _alignYAML(stream.getvalue(), pad=1, aligned_colons=True)
+    return _alignYAML(yaml.dump(d, Dumper=_SafeDumper, default_flow_style=False), pad=1, aligned_colons=True)
@@ -20,46 +20,38 @@ def rgb2hsv(x: torch.Tensor, mode: str = "normal", eps: float = 1e-8) -> torch.T
     returns:
         torch.Tensor: [N, C, H, W] Converted tensor.
     """
-    return {
-        "normal": _hsvNormal,
-        "advance": _hsvAdvance
-    }[mode](x, eps)
+    return _rgb2hsvRoutines[mode](x, eps)
 
 
 def _hsvNormal(x: torch.Tensor, eps: float) -> torch.Tensor:
     cMax, maxIdx = x.max(1)
-    cMin, minIdx = x.min(1)
+    cMin = x.amin(1)
 
     sub = cMax - cMin
 
-    # don't need requires_grad
-    hsv = torch.empty_like(x)
+    # hue = (2 * maxIdx + x[maxIdx + 1] - x[maxIdx + 2]) / sub, channels indexed cyclically, in one pass without masked writes.
+    index = maxIdx.unsqueeze(1)
+    diff = (x.gather(1, (index + 1) % 3) - x.gather(1, (index + 2) % 3)).squeeze(1)
+    # Gray pixels, where argmax and argmin coincide, have zero hue. Divisors there are replaced so no NaN is produced, also in gradients.
+    gray = sub == 0
+    hue = ((2. * maxIdx.to(x.dtype) + diff / sub.masked_fill(gray, 1.)) / 6. % 1.).masked_fill(gray, 0.)
 
-    idx = maxIdx == 0
-    hsv[:, 0][idx] = (x[:, 1][idx] - x[:, 2][idx]) / sub[idx]
+    dark = cMax.abs() < eps
+    s = (1 - cMin / cMax.masked_fill(dark, 1.)).masked_fill(dark, 0.)
 
-    idx = maxIdx == 1
-    hsv[:, 0][idx] = 2. + (x[:, 2][idx] - x[:, 0][idx]) / sub[idx]
-
-    idx = maxIdx == 2
-    hsv[:, 0][idx] = 4. + (x[:, 0][idx] - x[:, 1][idx]) / sub[idx]
-
-    hsv[:, 0] = hsv[:, 0] / 6. % 1.
-    hsv[:, 0][maxIdx == minIdx] = 0.0
-
-    s = 1 - cMin / cMax
-    s[cMax.abs() < eps] = 0.0
-
-    hsv[:, 1] = s
-    hsv[:, 2] = cMax
-
-    return hsv
+    return torch.stack((hue, s, cMax), 1)
 
 
 def _hsvAdvance(x: torch.Tensor, eps: float) -> torch.Tensor:
     raise NotImplementedError
 
 
+_rgb2hsvRoutines = {
+    "normal": _hsvNormal,
+    "advance": _hsvAdvance
+}
+
+
 def hsv2rgb(x: torch.Tensor, mode: str = "normal", eps: float = 1e-8) -> torch.Tensor:
     """Map rgb color space to HSV color space
 
@@ -73,23 +65,33 @@ def hsv2rgb(x: torch.Tensor, mode: str = "normal", eps: float = 1e-8) -> torch.T
     returns:
         torch.Tensor: [N, C, H, W] Converted tensor.
     """
-    return {
-        "normal": _rgbNormal,
-        "advance": _rgbAdvance
-    }[mode](x, eps)
+    return _hsv2rgbRoutines[mode](x, eps)
+
+
+# Indices into (v, t, p, q) of r, g, b for each hue sector.
+_SECTORS = torch.tensor([[0, 1, 2], [3, 0, 2], [2, 0, 1], [2, 3, 0], [1, 2, 0], [0, 2, 3]])
 
 
 def _rgbNormal(x: torch.Tensor, eps: float) -> torch.Tensor:
-    hi = (x[:, 0] * 6).floor()
-    f = x[:, 0] * 6 - hi
+    h = x[:, 0] * 6
+    hi = h.floor()
+    f = h - hi
     p = x[:, 2] * (1 - x[:, 1])
     q = x[:, 2] * (1 - f * x[:, 1])
     t = x[:, 2] * (1 - (1 - f) * x[:, 1])
     v = x[:, 2]
 
-    hi = torch.stack([hi, hi, hi], axis=1).byte() % 6
-    return ((hi == 0) * torch.stack((v, t, p), axis=1)) + ((hi == 1) * torch.stack((q, v, p), axis=1)) + ((hi == 2) * torch.stack((p, v, t), axis=1)) + ((hi == 3) * torch.stack((p, q, v), axis=1)) + ((hi == 4) * torch.stack((t, p, v), axis=1)) + ((hi == 5) * torch.stack((v, p, q), axis=1))
+    # Each sector picks rgb from (v, t, p, q) by a fixed permutation, gathered in one pass. Hue of 1 wraps to the first sector.
+    values = torch.stack((v, t, p, q), 1)
+    index = _SECTORS.to(x.device)[hi.long() % 6].permute(0, 3, 1, 2)
+    return values.gather(1, index)
 
 
 def _rgbAdvance(x: torch.Tensor, eps: float) -> torch.Tensor:
     raise NotImplementedError
+
+
+_hsv2rgbRoutines = {
+    "normal": _rgbNormal,
+    "advance": _rgbAdvance
+}